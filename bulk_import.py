@@ -0,0 +1,231 @@
+"""
+bulk_import.py: This module provides the HoldingsImporter class, which imports stock holdings
+from a broker CSV or JSON export into the InvestNow user file. Rows are parsed, validated and
+merged into existing positions in vectorized form, using the same weighted-average purchase
+price as PortfolioAnalysis.add_stock, and the user file is written once for the whole import.
+Brokers that export the total cost of a position instead of a per-share price are supported:
+the per-share purchase price is the total cost divided by the number of shares.
+"""
+
+import json
+import os
+import numpy as np
+import pandas as pd
+
+# Broker column names accepted for each field. 'total_cost' is the cost of the whole position and
+# is only used when the file has no per-share price column.
+COLUMN_ALIASES = {
+    'username': ['username', 'user', 'account', 'account_id'],
+    'symbol': ['symbol', 'ticker', 'instrument'],
+    'shares': ['shares', 'quantity', 'qty', 'units'],
+    'purchase_price': ['purchase_price', 'price', 'cost_per_share', 'cost_basis_per_share', 'unit_cost',
+                       'average_price', 'avg_price', 'average_cost', 'avg_cost'],
+    'total_cost': ['total_cost', 'cost', 'cost_basis', 'book_cost', 'book_value']
+}
+
+
+class HoldingsImporter:
+    """
+    Class to import holdings in bulk into the user file.
+    """
+
+    def __init__(self, user_file='users.json'):
+        """
+        Initialize the HoldingsImporter.
+
+        Parameters
+        ----------
+        user_file : str
+            The JSON file holding the user data.
+        """
+        self.user_file = user_file
+
+    def load_users(self):
+        """
+        Load the user data from a json file.
+        """
+        try:
+            with open(self.user_file, encoding='utf-8') as file:
+                return json.load(file)
+        except FileNotFoundError:
+            return {}
+
+    def save_users(self, users):
+        """
+        Save the user data to a json file.
+        """
+        with open(self.user_file, 'w', encoding='utf-8') as file:
+            json.dump(users, file)
+
+    @staticmethod
+    def read_holdings(path):
+        """
+        Read a broker export into a holdings table.
+
+        Parameters
+        ----------
+        path : str
+            A .csv file, or a .json file holding a list of records.
+
+        Returns
+        -------
+        pandas.DataFrame
+            The rows with their columns renamed to 'username', 'symbol', 'shares' and 'purchase_price'
+            or 'total_cost'. The 'username' column is absent if the file has no account column.
+            The index is the line number in a CSV file, or the record number in a JSON file.
+        """
+        if os.path.splitext(path)[1].lower() == '.json':
+            with open(path, encoding='utf-8') as file:
+                frame = pd.DataFrame(json.load(file))
+            frame.index = pd.RangeIndex(1, len(frame) + 1, name='record')
+        else:
+            frame = pd.read_csv(path, dtype=str, skipinitialspace=True)
+            frame.index = pd.RangeIndex(2, len(frame) + 2, name='line')  # Line 1 is the header
+
+        normalized = {column: str(column).strip().lower().replace(' ', '_') for column in frame.columns}
+        renames = {}
+        for field, aliases in COLUMN_ALIASES.items():
+            for column, name in normalized.items():
+                if name in aliases and field not in renames.values():
+                    renames[column] = field
+        fields = set(renames.values())
+        if 'purchase_price' in fields and 'total_cost' in fields:
+            fields.discard('total_cost')
+            renames = {column: field for column, field in renames.items() if field != 'total_cost'}
+        missing = {'symbol', 'shares'} - fields
+        if not fields & {'purchase_price', 'total_cost'}:
+            missing.add('purchase_price')
+        if missing:
+            raise ValueError(f"Holdings file is missing the columns: {', '.join(sorted(missing))}")
+        return frame.rename(columns=renames)[[field for field in COLUMN_ALIASES if field in fields]]
+
+    @staticmethod
+    def validate(holdings, users, username=None):
+        """
+        Validate holdings rows, the way PortfolioAnalysis.add_stock validates its inputs.
+
+        Parameters
+        ----------
+        holdings : pandas.DataFrame
+            The rows returned by read_holdings.
+        users : dict
+            The user data. Rows for unknown users are rejected.
+        username : str, optional
+            Import every row into this account. Rows naming a different account are rejected.
+
+        Returns
+        -------
+        tuple of pandas.DataFrame
+            The valid rows (with clean types) and the rejected rows with a 'reason' column.
+        """
+        frame = holdings.copy()
+        if username is not None:
+            if 'username' not in frame:
+                frame['username'] = username
+            frame['username'] = frame['username'].fillna(username)
+        elif 'username' not in frame:
+            raise ValueError("Holdings file has no account column and no account was given.")
+
+        frame['username'] = frame['username'].astype(str).str.strip()
+        frame['symbol'] = frame['symbol'].fillna('').astype(str).str.strip().str.upper()
+        shares = pd.to_numeric(frame['shares'], errors='coerce')
+        if 'purchase_price' in frame:
+            prices = pd.to_numeric(frame['purchase_price'], errors='coerce')
+        else:
+            prices = pd.to_numeric(frame['total_cost'], errors='coerce') / shares
+
+        reason = pd.Series('', index=frame.index)
+        checks = [
+            (frame['symbol'] == '', "Stock symbol cannot be empty."),
+            (shares.isna() | (shares != np.floor(shares)), "Invalid number of shares."),
+            (shares <= 0, "Number of shares should be a positive non-zero number."),
+            # Share counts are stored as 64-bit integers; inf and larger counts would overflow the cast
+            (shares >= float(np.iinfo(np.int64).max), "Number of shares is too large."),
+            (prices.isna(), "Invalid purchase price."),
+            (prices <= 0, "Purchase price should be a positive non-zero number."),
+            (~frame['username'].isin(list(users)), "Unknown account.")
+        ]
+        if username is not None:
+            checks.append((frame['username'] != username, "Row belongs to a different account."))
+        for failed, message in checks:
+            reason = reason.mask(failed & (reason == ''), message)
+
+        valid = reason == ''
+        rejected = holdings.loc[~valid].assign(reason=reason[~valid])
+        frame = frame.loc[valid].assign(shares=shares[valid].astype(np.int64), purchase_price=prices[valid])
+        return frame[['username', 'symbol', 'shares', 'purchase_price']], rejected
+
+    @staticmethod
+    def merge(users, holdings):
+        """
+        Merge valid holdings into the user data.
+
+        Rows for the same account and symbol are combined, and then combined with any existing
+        position, using the share-weighted average purchase price rounded to 2 decimal places.
+
+        Parameters
+        ----------
+        users : dict
+            The user data, updated in place.
+        holdings : pandas.DataFrame
+            The valid rows returned by validate.
+
+        Returns
+        -------
+        int
+            The number of positions added or updated.
+        """
+        if holdings.empty:
+            return 0
+
+        incoming = (holdings.assign(cost=holdings['shares'] * holdings['purchase_price'])
+                    .groupby(['username', 'symbol'], sort=False)[['shares', 'cost']].sum().reset_index())
+
+        affected = incoming['username'].unique()
+        existing = [(username, position, stock['symbol'].upper(), stock['shares'], stock['purchase_price'])
+                    for username in affected for position, stock in enumerate(users[username]['stocks'])]
+        existing = pd.DataFrame(existing, columns=['username', 'position', 'symbol', 'old_shares', 'old_price'])
+        existing = existing.drop_duplicates(['username', 'symbol'])
+
+        merged = incoming.merge(existing, on=['username', 'symbol'], how='left')
+        old_shares = merged['old_shares'].fillna(0).astype(np.int64)
+        old_cost = (old_shares * merged['old_price'].fillna(0.0)).to_numpy()
+        merged['total_shares'] = old_shares + merged['shares']
+        merged['weighted_price'] = ((old_cost + merged['cost']) / merged['total_shares']).round(2)
+
+        for row in merged.itertuples(index=False):
+            stocks = users[row.username]['stocks']
+            if pd.isna(row.position):
+                stocks.append({
+                    'symbol': row.symbol,
+                    'shares': int(row.total_shares),
+                    'purchase_price': float(row.weighted_price)
+                })
+            else:
+                stock = stocks[int(row.position)]
+                stock['shares'] = int(row.total_shares)
+                stock['purchase_price'] = float(row.weighted_price)
+        return len(merged)
+
+    def import_file(self, path, username=None):
+        """
+        Import a broker export into the user file with a single write.
+
+        Parameters
+        ----------
+        path : str
+            A .csv file, or a .json file holding a list of records.
+        username : str, optional
+            Import every row into this account. Otherwise the file needs an account column.
+
+        Returns
+        -------
+        tuple
+            The number of positions added or updated, and the rejected rows as a pandas.DataFrame.
+        """
+        users = self.load_users()
+        valid, rejected = self.validate(self.read_holdings(path), users, username)
+        positions = self.merge(users, valid)
+        if positions:
+            self.save_users(users)
+        return positions, rejected
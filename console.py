@@ -0,0 +1,114 @@
+"""
+console.py: This module provides the console I/O used by every menu of the InvestNow application.
+The Console class forwards to the built-in input() and print(). The ScriptedConsole class replays
+a recorded sequence of commands instead, capturing the output and timing each scripted action,
+which lets whole sessions be driven without a terminal.
+"""
+
+import time
+
+
+class ScriptExhausted(EOFError):
+    """Raised when a scripted session asks for more input than was recorded."""
+
+
+class Console:
+    """
+    The Console class reads user input from and prints output to the terminal.
+    """
+
+    def input(self, prompt=''):
+        """
+        Prompt the user and return the line they entered.
+
+        Parameters
+        ----------
+        prompt : str
+            The text displayed before reading the input.
+        """
+        return input(prompt)
+
+    def print(self, *args, **kwargs):
+        """
+        Print output to the terminal, taking the same arguments as the built-in print().
+        """
+        print(*args, **kwargs)
+
+
+class ScriptedConsole(Console):
+    """
+    The ScriptedConsole class answers prompts from a recorded script of actions.
+    An action is a named sequence of inputs, such as 'login' or 'add stock'. The time between
+    the first input of an action and the first input of the next one is recorded as the
+    latency of that action.
+    """
+
+    def __init__(self, actions, keep_output=False):
+        """
+        Initialize the ScriptedConsole.
+
+        Parameters
+        ----------
+        actions : list of tuple
+            The (name, inputs) pairs to replay, in order.
+        keep_output : bool
+            Whether to keep the printed output in the output attribute.
+        """
+        self._inputs = [(index, value) for index, (_, inputs) in enumerate(actions) for value in inputs]
+        self._names = [name for name, _ in actions]
+        self._position = 0
+        self._current = None
+        self._started = None
+        self.keep_output = keep_output
+        self.output = []
+        self.timings = []
+
+    def input(self, prompt=''):
+        """
+        Return the next scripted input.
+
+        Raises
+        ------
+        ScriptExhausted
+            If the script has no inputs left.
+        """
+        now = time.perf_counter()
+        if self.keep_output:
+            self.output.append(prompt)
+        if self._position >= len(self._inputs):
+            raise ScriptExhausted("The scripted session ran out of input.")
+
+        index, value = self._inputs[self._position]
+        self._position += 1
+        if index != self._current:
+            self._close_action(now)
+            self._current = index
+            self._started = now
+        return value
+
+    def print(self, *args, **kwargs):
+        """
+        Capture printed output instead of writing it to the terminal.
+        """
+        if self.keep_output:
+            self.output.append(kwargs.get('sep', ' ').join(str(arg) for arg in args))
+
+    def _close_action(self, now):
+        """
+        Internal method to record the latency of the action in progress.
+        """
+        if self._current is not None:
+            self.timings.append((self._names[self._current], now - self._started))
+            self._current = None
+
+    def finish(self):
+        """
+        Record the latency of the last action once the session has ended.
+
+        Returns
+        -------
+        list of tuple
+            The (action name, seconds) pairs of every completed action.
+        """
+        self._close_action(time.perf_counter())
+        return self.timings
@@ -0,0 +1,365 @@
+"""
+export.py: This module provides the ResultExporter class, which writes the results of the
+trading algorithm as columnar files for downstream reporting: portfolio weights, efficient
+frontier points, correlation matrices and rebalance trades. Files are written as Parquet when
+pyarrow is installed and as CSV otherwise. Results for all users are streamed in batches, so
+memory stays flat regardless of the number of accounts.
+"""
+
+import argparse
+import json
+import os
+from urllib.parse import quote
+import numpy as np
+import pandas as pd
+from fetch_scheduler import FetchError
+from returns_alignment import InsufficientHistoryError
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - depends on the environment
+    pa = None
+    pq = None
+
+# Column types of every exported dataset
+SCHEMAS = {
+    'weights': {'username': 'object', 'portfolio': 'object', 'symbol': 'object', 'weight': 'float64'},
+    'frontier': {'username': 'object', 'risk': 'float64', 'return': 'float64', 'sharpe_ratio': 'float64'},
+    'correlation': {'username': 'object', 'symbol': 'object', 'other_symbol': 'object',
+                    'correlation': 'float64'},
+    'trades': {'username': 'object', 'portfolio': 'object', 'symbol': 'object', 'action': 'object',
+               'shares': 'float64', 'current_weight': 'float64', 'target_weight': 'float64'}
+}
+
+
+def weights_frame(username, symbols, portfolios):
+    """
+    Build the weights dataset of a user.
+
+    Parameters
+    ----------
+    username : str
+        The user the weights belong to.
+    symbols : list of str
+        The symbols, in the order of the weight vectors.
+    portfolios : dict
+        Maps a portfolio name (e.g. 'Current', 'MVP', 'MSR') to its weight vector.
+    """
+    names = list(portfolios)
+    return pd.DataFrame({
+        'username': username,
+        'portfolio': np.repeat(names, len(symbols)),
+        'symbol': np.tile(symbols, len(names)),
+        'weight': np.concatenate([np.asarray(portfolios[name], dtype=np.float64) for name in names])
+    })
+
+
+def frontier_frame(username, frontier):
+    """
+    Build the frontier dataset of a user from the output of TradingAlgorithm.compute_frontier.
+    """
+    return pd.DataFrame({
+        'username': username,
+        'risk': frontier['Risk'].to_numpy(),
+        'return': frontier['Return'].to_numpy(),
+        'sharpe_ratio': frontier['Sharpe Ratio'].to_numpy()
+    })
+
+
+def correlation_frame(username, corr_matrix):
+    """
+    Build the correlation dataset of a user, one row per pair of symbols.
+    """
+    symbols = list(corr_matrix.columns)
+    return pd.DataFrame({
+        'username': username,
+        'symbol': np.repeat(symbols, len(symbols)),
+        'other_symbol': np.tile(symbols, len(symbols)),
+        'correlation': corr_matrix.to_numpy(dtype=np.float64).ravel()
+    })
+
+
+def trades_frame(username, portfolio, trades):
+    """
+    Build the rebalance trades dataset of a user from the output of
+    TradingAlgorithm.compute_rebalance_trades.
+    """
+    frame = pd.DataFrame(trades, columns=['symbol', 'action', 'shares', 'current_weight', 'target_weight'])
+    frame.insert(0, 'portfolio', portfolio)
+    frame.insert(0, 'username', username)
+    return frame
+
+
+class BatchWriter:
+    """
+    Class to append batches of rows to one exported dataset.
+    """
+
+    def __init__(self, path, dataset, use_parquet):
+        """
+        Initialize the BatchWriter. The file is created when the first batch is written.
+
+        Parameters
+        ----------
+        path : str
+            The file to write.
+        dataset : str
+            The dataset name, one of the keys of SCHEMAS.
+        use_parquet : bool
+            Whether to write Parquet instead of CSV.
+        """
+        self.path = path
+        self.columns = SCHEMAS[dataset]
+        self.use_parquet = use_parquet
+        self.rows = 0
+        self._writer = None
+        self._schema = None
+
+    def write_batch(self, frame):
+        """
+        Append a batch of rows.
+
+        Parameters
+        ----------
+        frame : pandas.DataFrame
+            The rows to append, with the dataset's columns.
+        """
+        frame = frame[list(self.columns)].astype(self.columns)
+        if self.use_parquet:
+            if self._writer is None:
+                self._schema = pa.Schema.from_pandas(frame, preserve_index=False)
+                self._writer = pq.ParquetWriter(self.path, self._schema)
+            self._writer.write_table(pa.Table.from_pandas(frame, schema=self._schema, preserve_index=False))
+        else:
+            frame.to_csv(self.path, mode='w' if self.rows == 0 else 'a', header=self.rows == 0, index=False)
+        self.rows += len(frame)
+
+    def close(self):
+        """Finish the file. An empty dataset still gets a file with its columns."""
+        if self.rows == 0:
+            self.write_batch(pd.DataFrame({column: pd.Series(dtype=dtype)
+                                           for column, dtype in self.columns.items()}))
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class ResultExporter:
+    """
+    Class to export trading algorithm results as columnar files.
+    """
+
+    def __init__(self, out_dir='exports', file_format=None):
+        """
+        Initialize the ResultExporter.
+
+        Parameters
+        ----------
+        out_dir : str
+            The directory the files are written to.
+        file_format : str, optional
+            'parquet' or 'csv'. Defaults to Parquet when pyarrow is installed, and CSV otherwise.
+        """
+        if file_format is None:
+            file_format = 'parquet' if pa is not None else 'csv'
+        if file_format not in ('parquet', 'csv'):
+            raise ValueError(f"Unknown export format: {file_format}")
+        if file_format == 'parquet' and pa is None:
+            raise ImportError("Parquet export requires pyarrow. Install it or use the 'csv' format.")
+        self.out_dir = out_dir
+        self.file_format = file_format
+
+    def path(self, name, dataset):
+        """
+        Return the path of an exported file.
+        The name is percent-encoded, so usernames with path separators stay inside out_dir.
+        """
+        return os.path.join(self.out_dir, f"{quote(name, safe='')}_{dataset}.{self.file_format}")
+
+    def open_stream(self, name, dataset):
+        """
+        Open a BatchWriter for one dataset.
+
+        Parameters
+        ----------
+        name : str
+            The prefix of the file name.
+        dataset : str
+            The dataset name, one of the keys of SCHEMAS.
+        """
+        os.makedirs(self.out_dir, exist_ok=True)
+        return BatchWriter(self.path(name, dataset), dataset, self.file_format == 'parquet')
+
+    def write(self, name, dataset, frame):
+        """
+        Write a whole dataset at once.
+
+        Returns
+        -------
+        str
+            The path of the written file.
+        """
+        with self.open_stream(name, dataset) as writer:
+            writer.write_batch(frame)
+        return writer.path
+
+    def user_results(self, trading_algorithm, username, frontier_points=5000, stocks=None):
+        """
+        Compute the exportable results of one user.
+
+        Parameters
+        ----------
+        trading_algorithm : TradingAlgorithm
+            Provides the prices, the time horizon and the optimizations.
+        username : str
+            The user to compute the results of.
+        frontier_points : int
+            Number of random portfolios in the frontier.
+        stocks : list of dict, optional
+            The user's stock records, if already loaded. Defaults to reading them from users.json.
+
+        Returns
+        -------
+        dict or None
+            Maps each dataset name to its rows, or None if the user has no stocks.
+        """
+        if stocks is None:
+            user_stocks = trading_algorithm.get_user_stocks(username)
+        else:
+            user_stocks = trading_algorithm.value_stocks(username, stocks)
+        if not user_stocks:
+            return None
+        symbols = [stock['symbol'] for stock in user_stocks]
+        returns = trading_algorithm.get_user_returns(username, symbols)
+
+        portfolios = {
+            'Current': [stock['weight'] for stock in user_stocks],
+            'MVP': trading_algorithm.minimum_variance_portfolio(returns).x,
+            'MSR': trading_algorithm.maximum_sharpe_ratio_portfolio(returns).x
+        }
+        trades = pd.concat([trades_frame(username, name,
+                                         trading_algorithm.compute_rebalance_trades(user_stocks, portfolios[name]))
+                            for name in ('MVP', 'MSR')], ignore_index=True)
+        return {
+            'weights': weights_frame(username, symbols, portfolios),
+            'frontier': frontier_frame(username, trading_algorithm.compute_frontier(returns, frontier_points)),
+            'correlation': correlation_frame(username, trading_algorithm.get_return_stats(returns).correlation()),
+            'trades': trades
+        }
+
+    def export_user(self, trading_algorithm, username, frontier_points=5000):
+        """
+        Export the results of one user, one file per dataset.
+
+        Returns
+        -------
+        list of str
+            The paths of the written files.
+        """
+        results = self.user_results(trading_algorithm, username, frontier_points)
+        if results is None:
+            return []
+        return [self.write(username, dataset, frame) for dataset, frame in results.items()]
+
+    def export_all_users(self, trading_algorithm, usernames=None, batch_size=100, frontier_points=1000,
+                         user_file='users.json'):
+        """
+        Export the results of many users, streaming them to one file per dataset in batches.
+        The user file is read once. Users whose results cannot be computed are skipped and
+        reported instead of aborting the export.
+
+        Parameters
+        ----------
+        trading_algorithm : TradingAlgorithm
+            Provides the prices, the time horizon and the optimizations.
+        usernames : iterable of str, optional
+            The users to export. Defaults to every user in the user file.
+        batch_size : int
+            Number of users buffered before a batch is written.
+        frontier_points : int
+            Number of random portfolios in each user's frontier.
+        user_file : str
+            The JSON file holding the user data.
+
+        Returns
+        -------
+        tuple of (list of str, dict)
+            The paths of the written files, and a mapping of each skipped user to the reason.
+        """
+        with open(user_file, encoding='utf-8') as file:
+            users = json.load(file)
+        if usernames is None:
+            usernames = list(users)
+        failures = {}
+
+        writers = {dataset: self.open_stream('all_users', dataset) for dataset in SCHEMAS}
+        buffers = {dataset: [] for dataset in SCHEMAS}
+        buffered_users = 0
+
+        def flush():
+            for dataset, frames in buffers.items():
+                if frames:
+                    writers[dataset].write_batch(pd.concat(frames, ignore_index=True))
+                    frames.clear()
+
+        try:
+            for username in usernames:
+                if username not in users:
+                    failures[username] = "User not found."
+                    continue
+                try:
+                    results = self.user_results(trading_algorithm, username, frontier_points,
+                                                stocks=users[username]['stocks'])
+                except (FetchError, InsufficientHistoryError) as error:
+                    failures[username] = str(error)
+                    continue
+                if results is None:
+                    continue
+                for dataset, frame in results.items():
+                    buffers[dataset].append(frame)
+                buffered_users += 1
+                if buffered_users == batch_size:
+                    flush()
+                    buffered_users = 0
+            flush()
+        finally:
+            for writer in writers.values():
+                writer.close()
+        return [writer.path for writer in writers.values()], failures
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export trading algorithm results for all InvestNow accounts.")
+    parser.add_argument('--user-file', default='users.json', help="JSON file holding the user data")
+    parser.add_argument('--out-dir', default='exports', help="directory the files are written to")
+    parser.add_argument('--format', choices=('parquet', 'csv'), help="file format, Parquet when pyarrow is installed")
+    parser.add_argument('--batch-size', type=int, default=100, help="number of users written per batch")
+    parser.add_argument('--frontier-points', type=int, default=1000,
+                        help="number of random portfolios in each user's frontier")
+    parser.add_argument('--start-date', help="first date of the time horizon (YYYY-MM-DD)")
+    parser.add_argument('--end-date', help="last date of the time horizon (YYYY-MM-DD)")
+    args = parser.parse_args()
+
+    from session import Session
+    from trading_algorithm import TradingAlgorithm
+    trading_algorithm = TradingAlgorithm(Session())
+    trading_algorithm.start_date = args.start_date or trading_algorithm.start_date
+    trading_algorithm.end_date = args.end_date or trading_algorithm.end_date
+
+    exporter = ResultExporter(args.out_dir, args.format)
+    paths, failures = exporter.export_all_users(trading_algorithm, batch_size=args.batch_size,
+                                                frontier_points=args.frontier_points, user_file=args.user_file)
+    print(f"Exported {len(paths)} files to {exporter.out_dir}:")
+    for path in paths:
+        print(path)
+    if failures:
+        print(f"\nSkipped {len(failures)} users:")
+        for username, reason in failures.items():
+            print(f"{username}: {reason}")
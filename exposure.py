@@ -0,0 +1,237 @@
+"""
+exposure.py: This module provides the FirmExposure class, which aggregates holdings across
+every account in the InvestNow application. It flattens users.json into a single holdings
+table once, keeps an inverted symbol -> holders index over it, and answers firm-wide
+rollups (total shares and market value per symbol, concentration rankings, holders of a
+symbol) with vectorized group-bys instead of rescanning the user file.
+
+Operations runs the reports with: python exposure.py [--top N] [--symbol SYMBOL] [--no-prices]
+"""
+
+import argparse
+import json
+import numpy as np
+import pandas as pd
+from prettytable import PrettyTable
+
+
+class FirmExposure:
+    """
+    Class to compute firm-wide exposure across all user portfolios.
+    """
+
+    def __init__(self, user_file='users.json'):
+        """
+        Initialize the FirmExposure object and build the holdings table.
+
+        Parameters
+        ----------
+        user_file : str
+            The JSON file holding the user data.
+        """
+        self.user_file = user_file
+        self.holdings = None
+        self._holders = {}
+        self.refresh()
+
+    def load_users(self):
+        """
+        Load the user data from a json file.
+        """
+        try:
+            with open(self.user_file, encoding='utf-8') as file:
+                return json.load(file)
+        except FileNotFoundError:
+            return {}
+
+    def refresh(self):
+        """
+        Rebuild the holdings table and the symbol -> holders index from the user file.
+        """
+        users = self.load_users()
+        usernames, symbols, shares, prices = [], [], [], []
+        for username, user in users.items():
+            for stock in user.get('stocks', []):
+                usernames.append(username)
+                symbols.append(stock['symbol'].upper())
+                shares.append(stock['shares'])
+                prices.append(stock['purchase_price'])
+
+        holdings = pd.DataFrame({
+            'username': pd.Series(usernames, dtype='object'),
+            'symbol': pd.Series(symbols, dtype='object'),
+            'shares': np.asarray(shares, dtype=np.int64),
+            'purchase_price': np.asarray(prices, dtype=np.float64)
+        })
+        holdings['cost_basis'] = holdings['shares'] * holdings['purchase_price']
+        self.holdings = holdings
+
+        # Group codes are computed once so rollups reduce to bincounts over the codes
+        self._symbol_codes, self._symbols = pd.factorize(holdings['symbol'], sort=True)
+        self._user_codes, self._usernames = pd.factorize(holdings['username'], sort=True)
+        num_symbols = len(self._symbols)
+        self._shares_by_symbol = np.bincount(self._symbol_codes, weights=holdings['shares'].to_numpy(),
+                                             minlength=num_symbols).astype(np.int64)
+        self._cost_by_symbol = np.bincount(self._symbol_codes, weights=holdings['cost_basis'].to_numpy(),
+                                           minlength=num_symbols)
+        pairs = np.unique(self._symbol_codes.astype(np.int64) * len(self._usernames) + self._user_codes)
+        self._holders_by_symbol = np.bincount(pairs // max(len(self._usernames), 1), minlength=num_symbols)
+
+        # Inverted index: row positions of each symbol in the holdings table
+        order = np.argsort(self._symbol_codes, kind='stable')
+        bounds = np.cumsum(np.bincount(self._symbol_codes, minlength=num_symbols))[:-1]
+        self._holders = dict(zip(self._symbols, np.split(order, bounds)))
+
+    def _market_values(self, prices):
+        """
+        Internal method to return the market value of every holding row.
+        Symbols without a price get a NaN market value.
+        """
+        if prices is None:
+            return np.full(len(self.holdings), np.nan)
+        symbol_prices = pd.Series(prices, dtype='float64').reindex(self._symbols).to_numpy()
+        return self.holdings['shares'].to_numpy() * symbol_prices[self._symbol_codes]
+
+    @staticmethod
+    def _sum_by(codes, values, size):
+        """
+        Internal method to sum values per group code, keeping NaN for groups with no valid value.
+        """
+        valid = ~np.isnan(values)
+        sums = np.bincount(codes[valid], weights=values[valid], minlength=size)
+        counts = np.bincount(codes[valid], minlength=size)
+        return np.where(counts > 0, sums, np.nan)
+
+    def symbol_totals(self, prices=None):
+        """
+        Aggregate total shares, cost basis and market value per symbol across all accounts.
+
+        Parameters
+        ----------
+        prices : dict or pandas.Series, optional
+            The latest price per symbol. Without it, market values are NaN.
+
+        Returns
+        -------
+        pandas.DataFrame
+            One row per symbol with 'shares', 'cost_basis', 'market_value' and 'holders' columns.
+        """
+        market_value = self._sum_by(self._symbol_codes, self._market_values(prices), len(self._symbols))
+        return pd.DataFrame({
+            'shares': self._shares_by_symbol,
+            'cost_basis': self._cost_by_symbol,
+            'market_value': market_value,
+            'holders': self._holders_by_symbol
+        }, index=pd.Index(self._symbols, name='symbol'))
+
+    def concentration(self, prices=None, top=None):
+        """
+        Rank symbols by their share of the firm's total exposure.
+
+        Exposure is measured by market value when prices are given, and by cost basis otherwise.
+
+        Parameters
+        ----------
+        prices : dict or pandas.Series, optional
+            The latest price per symbol.
+        top : int, optional
+            Only return the given number of most concentrated symbols.
+
+        Returns
+        -------
+        pandas.DataFrame
+            The per-symbol totals with an added 'weight' column, sorted by weight.
+        """
+        totals = self.symbol_totals(prices)
+        exposure = totals['market_value'] if prices is not None else totals['cost_basis']
+        firm_total = exposure.sum()
+        totals['weight'] = exposure / firm_total if firm_total else 0.0
+        totals = totals.sort_values('weight', ascending=False)
+        if top is not None:
+            totals = totals.head(top)
+        return totals
+
+    def holders_of(self, symbol, prices=None):
+        """
+        Return the accounts holding a given symbol.
+
+        Parameters
+        ----------
+        symbol : str
+            The ticker symbol.
+        prices : dict or pandas.Series, optional
+            The latest price per symbol.
+
+        Returns
+        -------
+        pandas.DataFrame
+            One row per holder, sorted by number of shares.
+        """
+        positions = self._holders.get(symbol.upper())
+        if positions is None:
+            return self.holdings.iloc[0:0].assign(market_value=np.nan)
+        holders = self.holdings.iloc[positions]
+        holders = holders.assign(market_value=self._market_values(prices)[positions])
+        return holders.sort_values('shares', ascending=False).reset_index(drop=True)
+
+    def user_totals(self, prices=None):
+        """
+        Aggregate cost basis and market value per account.
+
+        Parameters
+        ----------
+        prices : dict or pandas.Series, optional
+            The latest price per symbol.
+
+        Returns
+        -------
+        pandas.DataFrame
+            One row per account with 'positions', 'cost_basis' and 'market_value' columns.
+        """
+        size = len(self._usernames)
+        return pd.DataFrame({
+            'positions': np.bincount(self._user_codes, minlength=size),
+            'cost_basis': np.bincount(self._user_codes, weights=self.holdings['cost_basis'].to_numpy(),
+                                      minlength=size),
+            'market_value': self._sum_by(self._user_codes, self._market_values(prices), size)
+        }, index=pd.Index(self._usernames, name='username'))
+
+
+def print_frame(frame, title):
+    """
+    Print a report frame as a table.
+    """
+    table = PrettyTable([frame.index.name or ''] + list(frame.columns))
+    for row in frame.itertuples():
+        cells = [row[0]]
+        for column, value in zip(frame.columns, row[1:]):
+            if column == 'weight':
+                cells.append(f"{value:.2%}")
+            elif isinstance(value, float):
+                cells.append(f"{value:.2f}")
+            else:
+                cells.append(value)
+        table.add_row(cells)
+    print(f"\n{title}")
+    print(table)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Report firm-wide exposure across all InvestNow accounts.")
+    parser.add_argument('--user-file', default='users.json', help="JSON file holding the user data")
+    parser.add_argument('--top', type=int, default=20, help="number of symbols in the concentration ranking")
+    parser.add_argument('--symbol', help="also list the accounts holding this symbol")
+    parser.add_argument('--no-prices', action='store_true',
+                        help="measure exposure by cost basis instead of fetching latest prices")
+    args = parser.parse_args()
+
+    exposure = FirmExposure(args.user_file)
+    prices = None
+    if not args.no_prices:
+        from price_cache import LatestPriceCache
+        prices = LatestPriceCache().get_latest(list(exposure.symbol_totals().index))
+
+    print_frame(exposure.concentration(prices, top=args.top), f"Top {args.top} Symbols by Exposure")
+    if args.symbol:
+        holders = exposure.holders_of(args.symbol, prices).set_index('username')
+        print_frame(holders, f"Holders of {args.symbol.upper()}")
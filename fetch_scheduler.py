@@ -0,0 +1,375 @@
+"""
+fetch_scheduler.py: This module provides the FetchScheduler class, which sits in front of the
+price sources used by the InvestNow application. The symbols of a request are split into at
+most one batch per concurrency slot of the source and each batch is downloaded in a single call
+on a bounded thread pool. Transient failures (timeouts, rate limits) are retried with
+exponential backoff; unknown or delisted symbols fail at once. In-flight request coalescing lets
+concurrent requests for the same symbol and an overlapping date range share a single fetch.
+"""
+
+import random
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+import pandas as pd
+import yfinance as yf
+
+
+class FetchError(Exception):
+    """Raised when a price source fails to return data for a symbol."""
+
+
+class TransientFetchError(FetchError):
+    """
+    Raised when a fetch failed for a reason that may go away on retry, such as a timeout or a
+    rate limit. The prices fetched before the failure are kept in the partial attribute.
+    """
+
+    def __init__(self, message, partial=None):
+        super().__init__(message)
+        self.partial = partial if partial is not None else pd.DataFrame()
+
+
+class YahooPriceSource:
+    """
+    Price source that downloads adjusted close prices from Yahoo Finance.
+    """
+
+    name = 'yahoo'
+    max_concurrency = 4
+
+    def fetch(self, symbols, start, end):
+        """
+        Download the adjusted close prices of several symbols in one request.
+
+        Parameters
+        ----------
+        symbols : list of str
+            The ticker symbols.
+        start : str
+            The first date (YYYY-MM-DD), inclusive.
+        end : str
+            The last date (YYYY-MM-DD), exclusive.
+
+        Returns
+        -------
+        pandas.DataFrame
+            The adjusted close prices indexed by date, with a column for every symbol that has data.
+            Symbols without data, such as unknown or delisted tickers, are left out.
+
+        Raises
+        ------
+        TransientFetchError
+            If the download itself fails, e.g. on a timeout, rate limit or connection error.
+        """
+        try:
+            data = yf.download(list(symbols), start=start, end=end, progress=False, auto_adjust=False,
+                               group_by='column')
+        except Exception as error:  # pylint: disable=broad-except
+            raise TransientFetchError(f"Download of {', '.join(symbols)} failed: {error}") from error
+        if data is None or data.empty:
+            return pd.DataFrame()
+        prices = data['Adj Close']
+        if isinstance(prices, pd.Series):
+            prices = prices.to_frame(symbols[0])
+        return prices.dropna(axis=1, how='all')
+
+
+class FakePriceSource:
+    """
+    Local price source for testing. It serves prices from a DataFrame and can inject
+    latency and transient failures. Every call is recorded in the calls attribute.
+    """
+
+    name = 'fake'
+
+    def __init__(self, prices, latency=0.0, failure_rate=0.0, fail_first=0, max_concurrency=4, seed=None):
+        """
+        Initialize the FakePriceSource.
+
+        Parameters
+        ----------
+        prices : pandas.DataFrame
+            The prices to serve, one column per symbol, indexed by date.
+        latency : float
+            Seconds each fetch takes.
+        failure_rate : float
+            Probability of each fetch failing with a TransientFetchError.
+        fail_first : int
+            Number of initial fetches of each symbol that fail before any succeeds.
+        max_concurrency : int
+            The concurrency limit the scheduler applies to this source.
+        seed : int, optional
+            Seed for the failure injection.
+        """
+        self.prices = prices
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.fail_first = fail_first
+        self.max_concurrency = max_concurrency
+        self.calls = []
+        self._failures = {}
+        self._random = random.Random(seed)
+        self._active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def fetch(self, symbols, start, end):
+        """
+        Return the stored prices of the symbols between start (inclusive) and end (exclusive).
+        Unknown symbols are left out of the result, like symbols without data on Yahoo Finance.
+        """
+        with self._lock:
+            self.calls.append((tuple(symbols), start, end))
+            self._active += 1
+            self.max_active = max(self.max_active, self._active)
+            failed = []
+            for symbol in symbols:
+                failures = self._failures.get(symbol, 0)
+                if failures < self.fail_first or self._random.random() < self.failure_rate:
+                    self._failures[symbol] = failures + 1
+                    failed.append(symbol)
+        try:
+            if self.latency:
+                time.sleep(self.latency)
+            known = [symbol for symbol in symbols if symbol in self.prices.columns]
+            prices = self.prices[known]
+            mask = (prices.index >= pd.Timestamp(start)) & (prices.index < pd.Timestamp(end))
+            prices = prices[mask].dropna(axis=1, how='all')
+            if failed:
+                raise TransientFetchError(f"Injected failure for {', '.join(failed)}.",
+                                          partial=prices.drop(columns=failed, errors='ignore'))
+            return prices
+        finally:
+            with self._lock:
+                self._active -= 1
+
+
+class FetchScheduler:
+    """
+    Class to schedule price fetches across price sources.
+    """
+
+    def __init__(self, source=None, max_workers=8, retries=3, backoff=0.5, max_backoff=8.0, sleep=time.sleep):
+        """
+        Initialize the FetchScheduler.
+
+        Parameters
+        ----------
+        source : object, optional
+            The default price source. Defaults to Yahoo Finance.
+        max_workers : int
+            Size of the shared thread pool.
+        retries : int
+            Number of retries after a transient failure.
+        backoff : float
+            Seconds to wait before the first retry. The wait doubles on every retry.
+        max_backoff : float
+            Upper bound on the wait between retries.
+        sleep : callable
+            Function used to wait between retries.
+        """
+        self.source = source or YahooPriceSource()
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self._sleep = sleep
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='price-fetch')
+        self._limits = {}  # source name -> semaphore
+        self._in_flight = {}  # (source name, symbol) -> list of (start, end, future)
+        self._lock = threading.Lock()
+
+    def _limit(self, source):
+        """
+        Internal method to return the concurrency limit of a source. The caller must hold the lock.
+        """
+        if source.name not in self._limits:
+            self._limits[source.name] = threading.BoundedSemaphore(getattr(source, 'max_concurrency', 4))
+        return self._limits[source.name]
+
+    def _run(self, source, limit, symbols, start, end):
+        """
+        Internal method to fetch a batch of symbols, retrying transient failures with exponential
+        backoff. Only the symbols still missing are fetched again on a retry.
+        """
+        delay = self.backoff
+        fetched = []
+        pending = list(symbols)
+        for attempt in range(self.retries + 1):
+            try:
+                with limit:
+                    fetched.append(source.fetch(pending, start, end))
+                break
+            except (TransientFetchError, OSError) as error:
+                if attempt == self.retries:
+                    raise
+                partial = getattr(error, 'partial', None)
+                if partial is not None and not partial.empty:
+                    fetched.append(partial)
+                    pending = [symbol for symbol in pending if symbol not in partial.columns]
+            self._sleep(delay)
+            delay = min(delay * 2, self.max_backoff)
+        return pd.concat(fetched, axis=1) if fetched else pd.DataFrame()
+
+    @staticmethod
+    def _column(future, symbol):
+        """
+        Internal method to derive the future of one symbol from the future of its batch.
+        """
+        derived = Future()
+
+        def complete(done):
+            if done.exception() is not None:
+                derived.set_exception(done.exception())
+            elif symbol not in done.result().columns:
+                derived.set_exception(FetchError(f"No price data returned for {symbol}."))
+            else:
+                derived.set_result(done.result()[symbol].dropna())
+
+        future.add_done_callback(complete)
+        return derived
+
+    def submit_many(self, symbols, start, end, source=None):
+        """
+        Schedule the fetch of several symbols, sharing any in-flight fetches that cover the range.
+        The remaining symbols are split into at most one batch per concurrency slot of the source.
+
+        Parameters
+        ----------
+        symbols : list of str
+            The ticker symbols.
+        start : str
+            The first date (YYYY-MM-DD), inclusive.
+        end : str
+            The last date (YYYY-MM-DD), exclusive.
+        source : object, optional
+            The price source. Defaults to the scheduler's source.
+
+        Returns
+        -------
+        dict
+            Maps each symbol to a future resolving to its prices as a pandas.Series.
+        """
+        source = source or self.source
+        futures = {}
+        with self._lock:
+            for symbol in dict.fromkeys(symbols):
+                for in_flight_start, in_flight_end, future in self._in_flight.get((source.name, symbol), []):
+                    if in_flight_start <= start and end <= in_flight_end:
+                        if (in_flight_start, in_flight_end) == (start, end):
+                            futures[symbol] = future
+                        else:
+                            futures[symbol] = self._slice(future, start, end)
+                        break
+
+            missing = [symbol for symbol in dict.fromkeys(symbols) if symbol not in futures]
+            limit = self._limit(source)
+            num_batches = min(getattr(source, 'max_concurrency', 4), len(missing))
+            entries = []
+            for i in range(num_batches):
+                batch = missing[i::num_batches]
+                batch_future = self._executor.submit(self._run, source, limit, batch, start, end)
+                for symbol in batch:
+                    futures[symbol] = self._column(batch_future, symbol)
+                    entry = ((source.name, symbol), (start, end, futures[symbol]))
+                    self._in_flight.setdefault(entry[0], []).append(entry[1])
+                    entries.append(entry)
+
+        for key, entry in entries:
+            def release(_, key=key, entry=entry):
+                with self._lock:
+                    in_flight = self._in_flight.get(key, [])
+                    if entry in in_flight:
+                        in_flight.remove(entry)
+                    if not in_flight:
+                        self._in_flight.pop(key, None)
+
+            entry[2].add_done_callback(release)
+        return futures
+
+    def submit(self, symbol, start, end, source=None):
+        """
+        Schedule the fetch of one symbol, sharing any in-flight fetch that covers the range.
+
+        Returns
+        -------
+        concurrent.futures.Future
+            A future resolving to the prices of the symbol as a pandas.Series.
+        """
+        return self.submit_many([symbol], start, end, source)[symbol]
+
+    @staticmethod
+    def _slice(future, start, end):
+        """
+        Internal method to derive a future for a sub-range of an in-flight fetch.
+        """
+        derived = Future()
+
+        def complete(done):
+            if done.exception() is not None:
+                derived.set_exception(done.exception())
+                return
+            prices = done.result()
+            mask = (prices.index >= pd.Timestamp(start)) & (prices.index < pd.Timestamp(end))
+            derived.set_result(prices[mask])
+
+        future.add_done_callback(complete)
+        return derived
+
+    def fetch(self, symbols, start, end, source=None):
+        """
+        Fetch the prices of several symbols.
+
+        Parameters
+        ----------
+        symbols : list of str
+            The ticker symbols.
+        start : str
+            The first date (YYYY-MM-DD), inclusive.
+        end : str
+            The last date (YYYY-MM-DD), exclusive.
+        source : object, optional
+            The price source. Defaults to the scheduler's source.
+
+        Returns
+        -------
+        pandas.DataFrame
+            The prices indexed by date, with one column per symbol in the requested order.
+        """
+        futures = self.submit_many(symbols, start, end, source)
+        columns = [futures[symbol].result().rename(symbol) for symbol in symbols]
+        if not columns:
+            return pd.DataFrame()
+        return pd.concat(columns, axis=1).sort_index()
+
+    def shutdown(self):
+        """Stop the thread pool once the scheduled fetches are complete."""
+        self._executor.shutdown(wait=True)
+
+
+_default_scheduler = None
+_default_lock = threading.Lock()
+
+
+def default_scheduler():
+    """
+    Return the scheduler shared by every part of the application in this process.
+    """
+    global _default_scheduler  # pylint: disable=global-statement
+    with _default_lock:
+        if _default_scheduler is None:
+            _default_scheduler = FetchScheduler()
+        return _default_scheduler
+
+
+def set_default_source(source):
+    """
+    Replace the price source of the shared scheduler, for instance with a FakePriceSource.
+
+    Parameters
+    ----------
+    source : object
+        Any object with a name, a max_concurrency and a fetch(symbols, start, end) method
+        returning a pandas.DataFrame with a column for every symbol that has data.
+    """
+    default_scheduler().source = source
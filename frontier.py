@@ -0,0 +1,125 @@
+"""
+frontier.py: This module provides the FrontierGrid class, which precomputes a dense grid of
+efficient long-only portfolios for a set of holdings over a time horizon. Once the grid is
+built, the portfolio for a target volatility or a profile's risk tolerance is found by binary
+search and linear interpolation over the grid instead of running a new optimization.
+"""
+
+import numpy as np
+from scipy.optimize import minimize
+from returns_alignment import pairwise_complete_stats
+import kernels
+
+# Position of each risk tolerance between the lowest and highest volatility on the frontier
+RISK_TOLERANCE_LEVELS = {'low': 0.0, 'medium': 0.5, 'high': 1.0}
+
+
+class FrontierGrid:
+    """
+    Class to hold a precomputed efficient frontier and look up portfolios on it.
+    """
+
+    def __init__(self, returns, num_points=100, stats=None):
+        """
+        Initialize the FrontierGrid and solve every point of the grid.
+
+        Parameters
+        ----------
+        returns : pandas.DataFrame
+            Daily returns, one column per asset.
+        num_points : int
+            Number of portfolios on the grid, from the minimum variance portfolio
+            to the highest-return portfolio. Points the solver fails on are left out
+            and counted in the failed_points attribute.
+        stats : ReturnStats, optional
+            Precomputed statistics of the returns.
+        """
+        stats = stats or pairwise_complete_stats(returns)
+        self.symbols = list(returns.columns)
+        self.mean = stats.mean * 252
+        self.cov = stats.cov * 252
+
+        num_assets = len(self.symbols)
+        bounds = tuple((0.0, 1.0) for _ in range(num_assets))
+        budget = {'type': 'eq', 'fun': lambda x: np.sum(x) - 1, 'jac': lambda x: np.ones_like(x)}
+
+        def variance(x):
+            return x @ self.cov @ x
+
+        def variance_jac(x):
+            return 2 * self.cov @ x
+
+        equal_weights = np.full(num_assets, 1 / num_assets)
+        mvp = minimize(variance, equal_weights, jac=variance_jac,
+                       method='SLSQP', bounds=bounds, constraints=(budget,))
+        if not mvp.success:
+            raise ValueError(f"Could not solve the minimum variance portfolio: {mvp.message}")
+        targets = np.linspace(self.mean @ mvp.x, self.mean.max(), num_points)
+
+        solved = [mvp.x]
+        self.failed_points = 0
+        for target in targets[1:]:
+            target_return = {'type': 'eq', 'fun': lambda x, target=target: self.mean @ x - target,
+                             'jac': lambda x: self.mean}
+            # Warm-start from the previous point, which is close on a dense grid, and retry from
+            # equal weights if that fails
+            for start in (solved[-1], equal_weights):
+                result = minimize(variance, start, jac=variance_jac, method='SLSQP',
+                                  bounds=bounds, constraints=(budget, target_return))
+                if result.success:
+                    solved.append(result.x)
+                    break
+            else:
+                self.failed_points += 1  # Left out of the grid rather than kept with wrong weights
+
+        weights = np.clip(np.array(solved), 0.0, None)
+        self.weights = weights / weights.sum(axis=1, keepdims=True)
+        self.returns = self.weights @ self.mean
+        # Volatility is non-decreasing along the efficient frontier; enforce it against rounding noise
+        self.volatilities = np.maximum.accumulate(np.sqrt(kernels.quadratic_forms(self.weights, self.cov)))
+
+    def portfolio_for_volatility(self, target_volatility):
+        """
+        Return the efficient portfolio with the given annualized volatility.
+
+        Targets outside the frontier are clamped to its lowest or highest volatility.
+
+        Parameters
+        ----------
+        target_volatility : float
+            The annualized volatility to target.
+
+        Returns
+        -------
+        tuple
+            The (weights, expected return, volatility) of the portfolio.
+        """
+        vols = self.volatilities
+        target = min(max(target_volatility, vols[0]), vols[-1])
+        upper = int(np.searchsorted(vols, target))
+        if upper == 0 or vols[upper] == vols[upper - 1]:
+            weights = self.weights[upper]
+        else:
+            fraction = (target - vols[upper - 1]) / (vols[upper] - vols[upper - 1])
+            weights = (1 - fraction) * self.weights[upper - 1] + fraction * self.weights[upper]
+        return weights, float(weights @ self.mean), float(np.sqrt(weights @ self.cov @ weights))
+
+    def portfolio_for_risk_tolerance(self, risk_tolerance):
+        """
+        Return the efficient portfolio matching a profile's risk tolerance.
+
+        Parameters
+        ----------
+        risk_tolerance : str
+            'low', 'medium' or 'high'.
+
+        Returns
+        -------
+        tuple
+            The (weights, expected return, volatility) of the portfolio.
+        """
+        level = RISK_TOLERANCE_LEVELS.get(str(risk_tolerance).lower())
+        if level is None:
+            raise ValueError(f"Unknown risk tolerance: {risk_tolerance}")
+        vols = self.volatilities
+        return self.portfolio_for_volatility(vols[0] + level * (vols[-1] - vols[0]))
@@ -0,0 +1,108 @@
+"""
+horizons.py: This module provides the HorizonComparison class, which compares the minimum
+variance and maximum Sharpe ratio portfolios of a set of holdings over several time horizons
+ending on the same date. The returns of the longest horizon are loaded once and every shorter
+horizon is a trailing slice of the same returns, so the comparison needs no extra price data
+and its cost grows with the number of horizons times the cost of one solve.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+from returns_alignment import pairwise_complete_stats
+
+# Horizon label -> number of years before the end date, or a fixed start date
+HORIZONS = {'1Y': 1, '3Y': 3, '5Y': 5, 'Since 2015': '2015-01-01'}
+
+
+def horizon_starts(end_date, horizons=None):
+    """
+    Return the start date of every horizon ending on end_date.
+
+    Parameters
+    ----------
+    end_date : str
+        The last date of every horizon (YYYY-MM-DD).
+    horizons : dict, optional
+        Maps each label to a number of years or a start date. Defaults to HORIZONS.
+
+    Returns
+    -------
+    dict
+        Maps each label to its start date as a pandas.Timestamp.
+    """
+    end = pd.Timestamp(end_date)
+    starts = {}
+    for label, horizon in (horizons or HORIZONS).items():
+        if isinstance(horizon, int):
+            starts[label] = end - pd.DateOffset(years=horizon)
+        else:
+            starts[label] = pd.Timestamp(horizon)
+    return starts
+
+
+class HorizonComparison:
+    """
+    Class to slice one returns frame into several trailing horizons and solve them side by side.
+    """
+
+    def __init__(self, returns, end_date, horizons=None):
+        """
+        Initialize the HorizonComparison and compute the statistics of every horizon.
+
+        Parameters
+        ----------
+        returns : pandas.DataFrame
+            Daily returns covering the longest horizon, one column per asset.
+        end_date : str
+            The last date of every horizon (YYYY-MM-DD).
+        horizons : dict, optional
+            Maps each label to a number of years or a start date. Defaults to HORIZONS.
+        """
+        self.symbols = list(returns.columns)
+        self.starts = horizon_starts(end_date, horizons)
+        positions = returns.index.searchsorted(list(self.starts.values()))
+        # Trailing slices share the memory of the returns frame
+        self.returns = {label: returns.iloc[position:] for label, position in zip(self.starts, positions)}
+        self.stats = {label: pairwise_complete_stats(sliced) for label, sliced in self.returns.items()}
+
+    def solve(self, optimizers, max_workers=None):
+        """
+        Run every optimizer on every horizon concurrently.
+
+        Parameters
+        ----------
+        optimizers : dict
+            Maps each portfolio name to a callable taking a horizon's returns and returning weights.
+        max_workers : int, optional
+            Number of solver threads. Defaults to one per horizon and optimizer.
+
+        Returns
+        -------
+        pandas.DataFrame
+            One row per horizon and portfolio with 'Horizon', 'Portfolio', 'Start', 'Days',
+            'Return', 'Risk' and 'Sharpe Ratio' columns and one weight column per symbol.
+        """
+        tasks = [(label, name) for label in self.returns for name in optimizers]
+        with ThreadPoolExecutor(max_workers=max_workers or len(tasks) or 1,
+                                thread_name_prefix='horizon-solve') as executor:
+            futures = [executor.submit(optimizers[name], self.returns[label]) for label, name in tasks]
+            solutions = [np.asarray(future.result(), dtype=np.float64) for future in futures]
+
+        rows = []
+        for (label, name), weights in zip(tasks, solutions):
+            stats = self.stats[label]
+            expected_return = stats.mean @ weights * 252
+            risk = np.sqrt(weights @ stats.cov @ weights * 252)
+            row = {
+                'Horizon': label,
+                'Portfolio': name,
+                'Start': self.starts[label].strftime('%Y-%m-%d'),
+                'Days': len(self.returns[label]),
+                'Return': expected_return,
+                'Risk': risk,
+                'Sharpe Ratio': expected_return / risk
+            }
+            row.update(zip(self.symbols, weights))
+            rows.append(row)
+        return pd.DataFrame(rows)
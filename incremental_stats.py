@@ -0,0 +1,175 @@
+"""
+incremental_stats.py: This module provides the IncrementalReturnStats class, which keeps the
+return statistics of one user's holdings over one time horizon. When a holding is added or
+removed, only the row and column of that symbol are computed or dropped, in O(n*T) for n
+holdings and T days, and the pairwise covariance entries of the unchanged symbols are reused.
+Returns follow returns_alignment.daily_returns, so they match a full recomputation.
+"""
+
+import time
+import numpy as np
+import pandas as pd
+from returns_alignment import ReturnStats, center_returns, check_history, daily_returns, finalize_cov, pairwise_block
+
+
+class IncrementalReturnStats:
+    """
+    Class to maintain pairwise-complete return statistics that can be patched symbol by symbol.
+
+    Each symbol's returns are computed over its own trading days and aligned on the union of
+    all days, so adding a symbol with extra days leaves the existing pairwise entries valid.
+    The created_at attribute records when the prices were first fetched, so owners can rebuild
+    the statistics once new prices may be available.
+    """
+
+    def __init__(self, start_date, end_date):
+        """
+        Initialize empty statistics for a time horizon.
+
+        Parameters
+        ----------
+        start_date : str
+            The first date of the horizon (YYYY-MM-DD).
+        end_date : str
+            The last date of the horizon (YYYY-MM-DD).
+        """
+        self.start_date = start_date
+        self.end_date = end_date
+        self.created_at = time.time()
+        self.symbols = []
+        self.index = pd.DatetimeIndex([])
+        self.last_prices = {}
+        self.mean = np.empty(0)
+        self._centered = np.empty((0, 0))
+        self._weights = np.empty((0, 0))
+        self._cov = np.empty((0, 0))
+        self._counts = np.empty((0, 0))
+
+    def _align_rows(self, index):
+        """
+        Internal method to extend the stored days to include the given days.
+        Added days hold no return for the existing symbols, so their statistics do not change.
+        """
+        if index.isin(self.index).all():
+            return
+        union = self.index.union(index)
+        rows = union.get_indexer(self.index)
+        for name in ('_centered', '_weights'):
+            old = getattr(self, name)
+            new = np.zeros((len(union), old.shape[1]))
+            new[rows] = old
+            setattr(self, name, new)
+        self.index = union
+
+    def add(self, prices):
+        """
+        Add symbols from their prices, computing only their rows and columns of the covariance.
+
+        Parameters
+        ----------
+        prices : pandas.DataFrame
+            Prices indexed by date, one column per new symbol.
+        """
+        if prices.columns.empty:
+            return
+        for symbol in prices.columns:
+            if symbol in self.symbols:
+                raise ValueError(f"Symbol {symbol} is already part of the statistics.")
+            series = prices[symbol].dropna()
+            self.last_prices[symbol] = float(series.iloc[-1]) if not series.empty else np.nan
+        returns = daily_returns(prices)
+        columns = list(returns.columns)
+
+        self._align_rows(returns.index)
+        centered, weights, mean = center_returns(returns.reindex(self.index).to_numpy(dtype=np.float64))
+
+        all_centered = np.hstack([self._centered, centered])
+        all_weights = np.hstack([self._weights, weights])
+        cross, cross_counts = pairwise_block(all_centered, all_weights, centered, weights)
+
+        old, added = len(self.symbols), len(columns)
+        cov = np.empty((old + added, old + added))
+        counts = np.empty((old + added, old + added))
+        cov[:old, :old] = self._cov
+        counts[:old, :old] = self._counts
+        cov[:, old:] = cross
+        cov[old:, :] = cross.T
+        counts[:, old:] = cross_counts
+        counts[old:, :] = cross_counts.T
+
+        self._centered, self._weights = all_centered, all_weights
+        self._cov, self._counts = cov, counts
+        self.mean = np.concatenate([self.mean, mean])
+        self.symbols.extend(columns)
+
+    def remove(self, symbols):
+        """
+        Remove symbols, dropping their rows and columns of the covariance.
+
+        Parameters
+        ----------
+        symbols : list of str
+            The symbols to remove.
+        """
+        positions = [self.symbols.index(symbol) for symbol in symbols if symbol in self.symbols]
+        if not positions:
+            return
+        keep = np.setdiff1d(np.arange(len(self.symbols)), positions)
+        self._centered = self._centered[:, keep]
+        self._weights = self._weights[:, keep]
+        self._cov = self._cov[np.ix_(keep, keep)]
+        self._counts = self._counts[np.ix_(keep, keep)]
+        self.mean = self.mean[keep]
+        for symbol in symbols:
+            self.last_prices.pop(symbol, None)
+        self.symbols = [self.symbols[i] for i in keep]
+
+    def sync(self, symbols, fetch_prices):
+        """
+        Patch the statistics to cover exactly the given symbols.
+
+        Parameters
+        ----------
+        symbols : list of str
+            The user's current symbols.
+        fetch_prices : callable
+            Called with the list of added symbols; returns their prices as a pandas.DataFrame.
+        """
+        self.remove([symbol for symbol in self.symbols if symbol not in symbols])
+        added = [symbol for symbol in dict.fromkeys(symbols) if symbol not in self.symbols]
+        if added:
+            self.add(fetch_prices(added)[added])
+
+    def returns(self, symbols):
+        """
+        Return the daily returns of the symbols, NaN on days a symbol has no return.
+
+        Returns
+        -------
+        pandas.DataFrame
+            The returns indexed by date, one column per symbol in the requested order.
+        """
+        positions = [self.symbols.index(symbol) for symbol in symbols]
+        values = self._centered[:, positions] + self.mean[positions]
+        values[self._weights[:, positions] == 0] = np.nan
+        return pd.DataFrame(values, index=self.index, columns=list(symbols))
+
+    def stats(self, symbols, project_psd=True, min_periods=2):
+        """
+        Return the statistics of the symbols in the requested order.
+
+        Returns
+        -------
+        ReturnStats
+            The per-asset means and the pairwise-complete covariance.
+
+        Raises
+        ------
+        InsufficientHistoryError
+            If a symbol has fewer than min_periods returns.
+        """
+        positions = [self.symbols.index(symbol) for symbol in symbols]
+        block = np.ix_(positions, positions)
+        check_history(symbols, self._counts[block], min_periods)
+        cov = finalize_cov(self._cov[block], self._counts[block], project_psd, min_periods)
+        return ReturnStats(symbols, self.mean[positions], cov, self._counts[block])
@@ -0,0 +1,297 @@
+"""
+kernels.py: This module provides the numeric kernels behind the portfolio loops of the InvestNow
+application: batched quadratic forms (portfolio variances), evaluation of simulated portfolios
+and the steps of the Monte Carlo path simulation. When numba is installed, the kernels are
+JIT-compiled and run in parallel across cores; otherwise they fall back to vectorized NumPy.
+Both backends return the same results, which parity_check verifies.
+
+Set the INVESTNOW_KERNELS environment variable to 'numpy' to force the NumPy backend.
+Run "python kernels.py" to check parity; it exits with status 1 if the backends disagree.
+"""
+
+import math
+import os
+import sys
+import numpy as np
+
+try:
+    from numba import njit, prange
+except ImportError:  # pragma: no cover - depends on the environment
+    njit = None
+    prange = range
+
+BACKENDS = ('numba', 'numpy') if njit is not None else ('numpy',)
+DEFAULT_BACKEND = os.environ.get('INVESTNOW_KERNELS', BACKENDS[0])
+if DEFAULT_BACKEND not in BACKENDS:
+    DEFAULT_BACKEND = 'numpy'
+
+
+def _numpy_quadratic_forms(weights, cov):
+    return np.einsum('ij,jk,ik->i', weights, cov, weights)
+
+
+def _numpy_evaluate_portfolios(weights, mean, cov):
+    weights = weights / weights.sum(axis=1, keepdims=True)
+    returns = weights @ mean
+    risks = np.sqrt(_numpy_quadratic_forms(weights, cov))
+    return risks, returns, returns / risks
+
+
+def _numpy_accumulate_normal_step(cumulative, draws, mean, cholesky):
+    cumulative += mean + draws @ cholesky.T
+
+
+def _numpy_path_portfolio_returns(cumulative, weights):
+    return np.expm1(cumulative) @ weights.T
+
+
+if njit is not None:
+    @njit(parallel=True, cache=True)
+    def _numba_quadratic_forms(weights, cov):
+        num_portfolios, num_assets = weights.shape
+        result = np.empty(num_portfolios)
+        for k in prange(num_portfolios):
+            total = 0.0
+            for i in range(num_assets):
+                row = 0.0
+                for j in range(num_assets):
+                    row += cov[i, j] * weights[k, j]
+                total += weights[k, i] * row
+            result[k] = total
+        return result
+
+    @njit(parallel=True, cache=True)
+    def _numba_evaluate_portfolios(weights, mean, cov):
+        num_portfolios, num_assets = weights.shape
+        risks = np.empty(num_portfolios)
+        returns = np.empty(num_portfolios)
+        sharpe = np.empty(num_portfolios)
+        for k in prange(num_portfolios):
+            scale = 0.0
+            for i in range(num_assets):
+                scale += weights[k, i]
+            portfolio_return = 0.0
+            variance = 0.0
+            for i in range(num_assets):
+                w_i = weights[k, i] / scale
+                portfolio_return += w_i * mean[i]
+                row = 0.0
+                for j in range(num_assets):
+                    row += cov[i, j] * weights[k, j] / scale
+                variance += w_i * row
+            risks[k] = np.sqrt(variance)
+            returns[k] = portfolio_return
+            sharpe[k] = portfolio_return / risks[k]
+        return risks, returns, sharpe
+
+    @njit(parallel=True, cache=True)
+    def _numba_accumulate_normal_step(cumulative, draws, mean, cholesky):
+        num_paths, num_assets = draws.shape
+        for p in prange(num_paths):
+            for i in range(num_assets):
+                total = mean[i]
+                for j in range(i + 1):  # The factor is lower triangular
+                    total += cholesky[i, j] * draws[p, j]
+                cumulative[p, i] += total
+
+    @njit(parallel=True, cache=True)
+    def _numba_path_portfolio_returns(cumulative, weights):
+        num_paths, num_assets = cumulative.shape
+        num_portfolios = weights.shape[0]
+        result = np.zeros((num_paths, num_portfolios))
+        for p in prange(num_paths):
+            for i in range(num_assets):
+                growth = math.expm1(cumulative[p, i])
+                for k in range(num_portfolios):
+                    result[p, k] += growth * weights[k, i]
+        return result
+
+_KERNELS = {
+    'numpy': {
+        'quadratic_forms': _numpy_quadratic_forms,
+        'evaluate_portfolios': _numpy_evaluate_portfolios,
+        'accumulate_normal_step': _numpy_accumulate_normal_step,
+        'path_portfolio_returns': _numpy_path_portfolio_returns
+    }
+}
+if njit is not None:
+    _KERNELS['numba'] = {
+        'quadratic_forms': _numba_quadratic_forms,
+        'evaluate_portfolios': _numba_evaluate_portfolios,
+        'accumulate_normal_step': _numba_accumulate_normal_step,
+        'path_portfolio_returns': _numba_path_portfolio_returns
+    }
+
+
+def _kernel(name, backend):
+    """
+    Internal function to look up a kernel of a backend.
+    """
+    backend = backend or DEFAULT_BACKEND
+    if backend not in _KERNELS:
+        raise ValueError(f"Kernel backend '{backend}' is not available. Available backends: {BACKENDS}")
+    return _KERNELS[backend][name]
+
+
+def quadratic_forms(weights, cov, backend=None):
+    """
+    Compute w' C w for every row w of a weight matrix, e.g. the variances of many portfolios.
+
+    Parameters
+    ----------
+    weights : numpy.ndarray
+        Weight matrix with one row per portfolio.
+    cov : numpy.ndarray
+        The covariance matrix.
+    backend : str, optional
+        'numba' or 'numpy'. Defaults to numba when installed.
+
+    Returns
+    -------
+    numpy.ndarray
+        One value per portfolio.
+    """
+    weights = np.ascontiguousarray(weights, dtype=np.float64)
+    cov = np.ascontiguousarray(cov, dtype=np.float64)
+    return _kernel('quadratic_forms', backend)(weights, cov)
+
+
+def evaluate_portfolios(weights, mean, cov, backend=None):
+    """
+    Normalize simulated portfolio weights to sum to one and compute their risk, return and Sharpe ratio.
+
+    Parameters
+    ----------
+    weights : numpy.ndarray
+        Non-negative weight matrix with one row per portfolio.
+    mean : numpy.ndarray
+        Expected asset returns.
+    cov : numpy.ndarray
+        Asset return covariance, on the same time scale as the mean.
+    backend : str, optional
+        'numba' or 'numpy'. Defaults to numba when installed.
+
+    Returns
+    -------
+    tuple of numpy.ndarray
+        The (risk, return, Sharpe ratio) of every portfolio.
+    """
+    weights = np.ascontiguousarray(weights, dtype=np.float64)
+    mean = np.ascontiguousarray(mean, dtype=np.float64)
+    cov = np.ascontiguousarray(cov, dtype=np.float64)
+    return _kernel('evaluate_portfolios', backend)(weights, mean, cov)
+
+
+def accumulate_normal_step(cumulative, draws, mean, cholesky, backend=None):
+    """
+    Add one day of correlated normal log returns to the cumulative log returns of every path,
+    in place: cumulative += mean + draws @ cholesky.T.
+
+    Parameters
+    ----------
+    cumulative : numpy.ndarray
+        C-contiguous float64 matrix with one row per path and one column per asset, updated in place.
+    draws : numpy.ndarray
+        Independent standard normal draws of the same shape.
+    mean : numpy.ndarray
+        Mean daily log return per asset.
+    cholesky : numpy.ndarray
+        Lower Cholesky factor of the daily log return covariance.
+    backend : str, optional
+        'numba' or 'numpy'. Defaults to numba when installed.
+    """
+    draws = np.ascontiguousarray(draws, dtype=np.float64)
+    mean = np.ascontiguousarray(mean, dtype=np.float64)
+    cholesky = np.ascontiguousarray(cholesky, dtype=np.float64)
+    _kernel('accumulate_normal_step', backend)(cumulative, draws, mean, cholesky)
+
+
+def path_portfolio_returns(cumulative, weights, backend=None):
+    """
+    Compute the simple return of every portfolio on every path from cumulative asset log returns.
+
+    Parameters
+    ----------
+    cumulative : numpy.ndarray
+        Matrix with one row per path and one column per asset.
+    weights : numpy.ndarray
+        Weight matrix with one row per portfolio.
+    backend : str, optional
+        'numba' or 'numpy'. Defaults to numba when installed.
+
+    Returns
+    -------
+    numpy.ndarray
+        Matrix with one row per path and one column per portfolio.
+    """
+    cumulative = np.ascontiguousarray(cumulative, dtype=np.float64)
+    weights = np.ascontiguousarray(weights, dtype=np.float64)
+    return _kernel('path_portfolio_returns', backend)(cumulative, weights)
+
+
+def parity_check(num_portfolios=2000, num_assets=8, num_paths=5000, seed=0, tolerance=1e-9):
+    """
+    Run every kernel on both backends with the same random inputs.
+
+    Parameters
+    ----------
+    tolerance : float
+        Largest relative difference accepted between the backends.
+
+    Returns
+    -------
+    dict
+        The largest relative difference between the backends per kernel output.
+        Empty when numba is not installed.
+
+    Raises
+    ------
+    AssertionError
+        If any kernel output differs between the backends by more than the tolerance.
+    """
+    if 'numba' not in _KERNELS:
+        return {}
+    rng = np.random.default_rng(seed)
+    factor = rng.normal(size=(num_assets, num_assets))
+    cov = factor @ factor.T / num_assets
+    mean = rng.normal(0.1, 0.05, num_assets)
+    weights = rng.random((num_portfolios, num_assets))
+    draws = rng.standard_normal((num_paths, num_assets))
+    start = rng.normal(0.0, 0.05, (num_paths, num_assets))
+
+    def difference(numba_result, numpy_result):
+        scale = max(np.max(np.abs(numpy_result)), 1e-300)
+        return np.max(np.abs(numba_result - numpy_result)) / scale
+
+    differences = {
+        'quadratic_forms': difference(quadratic_forms(weights, cov, 'numba'), quadratic_forms(weights, cov, 'numpy'))
+    }
+    for name, numba_result, numpy_result in zip(('risk', 'return', 'sharpe_ratio'),
+                                                evaluate_portfolios(weights, mean, cov, 'numba'),
+                                                evaluate_portfolios(weights, mean, cov, 'numpy')):
+        differences[f'evaluate_portfolios.{name}'] = difference(numba_result, numpy_result)
+
+    cumulative = {backend: start.copy() for backend in ('numba', 'numpy')}
+    for backend, values in cumulative.items():
+        accumulate_normal_step(values, draws, mean / 252, np.linalg.cholesky(cov) / 16, backend)
+    differences['accumulate_normal_step'] = difference(cumulative['numba'], cumulative['numpy'])
+    differences['path_portfolio_returns'] = difference(path_portfolio_returns(start, weights[:10], 'numba'),
+                                                       path_portfolio_returns(start, weights[:10], 'numpy'))
+
+    mismatches = {kernel: value for kernel, value in differences.items() if not value <= tolerance}
+    if mismatches:
+        raise AssertionError("Kernel backends disagree: " + ", ".join(
+            f"{kernel} (relative difference {value:.3e})" for kernel, value in mismatches.items()))
+    return differences
+
+
+if __name__ == "__main__":
+    print(f"Kernel backends available: {', '.join(BACKENDS)} (default: {DEFAULT_BACKEND})")
+    try:
+        results = parity_check()
+    except AssertionError as error:
+        print(error)
+        sys.exit(1)
+    for kernel, difference in results.items():
+        print(f"{kernel}: max relative difference {difference:.3e}")
+    print("Backends agree." if results else "numba is not installed; only the NumPy backend is available.")
@@ -0,0 +1,213 @@
+"""
+load_test.py: This module provides a scripted session driver for load-testing the InvestNow menus.
+It creates synthetic users, replays a recorded command sequence (login, add stock, view MVP,
+rebalance, logout) for each of them through main() with a ScriptedConsole, and reports the
+latency percentiles of every action and the overall throughput.
+
+Users are split across worker processes. Each worker runs in its own directory with its own
+users.json, and serves prices from a local fixture instead of Yahoo Finance.
+
+Usage: python load_test.py --users 1000 --workers 8 [--fixture prices.csv]
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+from datetime import datetime
+from multiprocessing import Pool
+import numpy as np
+import pandas as pd
+
+SYMBOLS = ['AAPL', 'MSFT', 'GOOG', 'AMZN', 'META', 'NVDA', 'JPM', 'XOM', 'JNJ', 'PG', 'KO', 'PFE']
+
+
+def make_fixture(path, symbols=SYMBOLS, start='2015-01-01', seed=0):
+    """
+    Write a synthetic daily price fixture (one column per symbol) to a CSV file.
+
+    Parameters
+    ----------
+    path : str
+        The CSV file to write.
+    symbols : list of str
+        The symbols to generate prices for.
+    start : str
+        The first date of the fixture. The fixture runs until today.
+    seed : int
+        Seed for the random walk.
+    """
+    dates = pd.bdate_range(start, datetime.today())
+    rng = np.random.default_rng(seed)
+    log_returns = rng.normal(0.0004, 0.015, (len(dates), len(symbols)))
+    prices = pd.DataFrame(100 * np.exp(np.cumsum(log_returns, axis=0)), index=dates, columns=symbols)
+    prices.to_csv(path, index_label='Date')
+
+
+def make_users(usernames, symbols=SYMBOLS, seed=0):
+    """
+    Create synthetic user records holding a few stocks each.
+
+    Returns
+    -------
+    dict
+        The user data in the users.json format.
+    """
+    rng = np.random.default_rng(seed)
+    users = {}
+    for username in usernames:
+        held = rng.choice(symbols, size=3, replace=False)
+        users[username] = {
+            'password': 'password',
+            'email': f'{username}@example.com',
+            'stocks': [{'symbol': str(symbol), 'shares': int(rng.integers(1, 100)),
+                        'purchase_price': round(float(rng.uniform(50, 150)), 2)} for symbol in held]
+        }
+    return users
+
+
+def session_script(username, password, symbol):
+    """
+    Return the recorded command sequence replayed for one user.
+
+    Parameters
+    ----------
+    username : str
+        The user to log in as.
+    password : str
+        The user's password.
+    symbol : str
+        The stock added during the session.
+
+    Returns
+    -------
+    list of tuple
+        The (action name, inputs) pairs of the session.
+    """
+    return [
+        ('login', ['1', username, password]),
+        ('add stock', ['2', '2', symbol, '10', '100', 'n']),
+        ('view mvp', ['3', '1']),
+        ('rebalance', ['3', '1', 'n', '10']),
+        ('logout', ['4', '3'])
+    ]
+
+
+def run_shard(shard):
+    """
+    Replay the session script for a shard of users in a private working directory.
+
+    Parameters
+    ----------
+    shard : tuple
+        The (usernames, fixture path, seed) of the shard.
+
+    Returns
+    -------
+    list of tuple
+        The (action name, seconds) pairs of every completed action.
+    """
+    usernames, fixture, seed = shard
+
+    import matplotlib  # pylint: disable=import-outside-toplevel
+    matplotlib.use('Agg')  # Plots are rendered off-screen and never block
+    import matplotlib.pyplot as plt  # pylint: disable=import-outside-toplevel
+    from console import ScriptedConsole  # pylint: disable=import-outside-toplevel
+    from fetch_scheduler import FakePriceSource, set_default_source  # pylint: disable=import-outside-toplevel
+    import main  # pylint: disable=import-outside-toplevel
+
+    prices = pd.read_csv(fixture, index_col=0, parse_dates=True)
+    set_default_source(FakePriceSource(prices))
+
+    os.chdir(tempfile.mkdtemp(prefix='investnow-load-'))
+    users = make_users(usernames, list(prices.columns), seed)
+    with open('users.json', 'w', encoding='utf-8') as file:
+        json.dump(users, file)
+
+    rng = np.random.default_rng(seed)
+    timings = []
+    for username in usernames:
+        symbol = str(rng.choice(prices.columns))
+        console = ScriptedConsole(session_script(username, users[username]['password'], symbol))
+        main.main(console)
+        timings.extend(console.finish())
+        plt.close('all')
+    return timings
+
+
+def summarize(timings, elapsed):
+    """
+    Aggregate action timings into latency percentiles and throughput.
+
+    Parameters
+    ----------
+    timings : list of tuple
+        The (action name, seconds) pairs of every completed action.
+    elapsed : float
+        The wall-clock duration of the run in seconds.
+
+    Returns
+    -------
+    pandas.DataFrame
+        One row per action with its count, p50/p90/p99/max latency in milliseconds and throughput.
+    """
+    frame = pd.DataFrame(timings, columns=['action', 'seconds'])
+    grouped = frame.groupby('action', sort=False)['seconds']
+    summary = pd.DataFrame({
+        'count': grouped.size(),
+        'p50 (ms)': grouped.quantile(0.50) * 1000,
+        'p90 (ms)': grouped.quantile(0.90) * 1000,
+        'p99 (ms)': grouped.quantile(0.99) * 1000,
+        'max (ms)': grouped.max() * 1000,
+    })
+    summary['throughput (/s)'] = summary['count'] / elapsed
+    return summary
+
+
+def run(num_users, workers, fixture=None, seed=0):
+    """
+    Run the load test and return the summary.
+
+    Parameters
+    ----------
+    num_users : int
+        Number of synthetic users, one scripted session each.
+    workers : int
+        Number of worker processes.
+    fixture : str, optional
+        CSV price fixture. A synthetic one is generated if omitted.
+    seed : int
+        Seed for the synthetic data.
+    """
+    if fixture is None:
+        fixture = os.path.join(tempfile.mkdtemp(prefix='investnow-fixture-'), 'prices.csv')
+        make_fixture(fixture, seed=seed)
+    fixture = os.path.abspath(fixture)
+
+    usernames = [f'user{i}' for i in range(num_users)]
+    shards = [(usernames[i::workers], fixture, seed + i) for i in range(workers) if usernames[i::workers]]
+
+    started = time.perf_counter()
+    with Pool(len(shards)) as pool:
+        timings = [timing for shard in pool.map(run_shard, shards) for timing in shard]
+    elapsed = time.perf_counter() - started
+
+    summary = summarize(timings, elapsed)
+    summary.attrs['sessions_per_second'] = num_users / elapsed
+    summary.attrs['elapsed'] = elapsed
+    return summary
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load-test the InvestNow menus with scripted sessions.")
+    parser.add_argument('--users', type=int, default=100, help="number of synthetic users")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help="number of worker processes")
+    parser.add_argument('--fixture', help="CSV price fixture with one column per symbol")
+    parser.add_argument('--seed', type=int, default=0, help="seed for the synthetic data")
+    args = parser.parse_args()
+
+    result = run(args.users, args.workers, args.fixture, args.seed)
+    print(result.round(2).to_string())
+    print(f"\n{args.users} sessions in {result.attrs['elapsed']:.2f}s "
+          f"({result.attrs['sessions_per_second']:.2f} sessions/s)")
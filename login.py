@@ -10,14 +10,16 @@ from my_profile import MyProfile
 from portfolio_analysis import PortfolioAnalysis
 from trading_algorithm import TradingAlgorithm
 from session import Session
+from console import Console
 
 
 class Login:
     """Class to handle login operations."""
 
-    def __init__(self, session: Session):
+    def __init__(self, session: Session, console: Console = None):
         """Initialize the Login object and load users."""
         self.session = session
+        self.console = console or Console()
         self.user_file = 'users.json'
         self.users = self.load_users()
 
@@ -31,18 +33,18 @@ class Login:
 
     def user_menu(self):
         """Display the user menu and handle the user's choice."""
-        profile = MyProfile(self.session)
-        portfolio_analysis = PortfolioAnalysis(self.session)
-        trading_algorithm = TradingAlgorithm(self.session)
+        profile = MyProfile(self.session, self.console)
+        portfolio_analysis = PortfolioAnalysis(self.session, self.console)
+        trading_algorithm = TradingAlgorithm(self.session, self.console)
 
         while True:
-            print("\nInvestNow - Democratize Investing")
-            print("1. Profile")
-            print("2. Portfolio Analysis")
-            print("3. Trading Algorithm")
-            print("4. Logout")
+            self.console.print("\nInvestNow - Democratize Investing")
+            self.console.print("1. Profile")
+            self.console.print("2. Portfolio Analysis")
+            self.console.print("3. Trading Algorithm")
+            self.console.print("4. Logout")
 
-            choice = input("Enter your choice: ")
+            choice = self.console.input("Enter your choice: ")
 
             if choice == "1":
                 profile.prompt_user()
@@ -51,37 +53,37 @@ class Login:
             elif choice == "3":
                 trading_algorithm.prompt_user()
             elif choice == "4":
-                print("\nLogging out.")
+                self.console.print("\nLogging out.")
                 break
             else:
-                print("\nInvalid choice. Please enter a number between 1 and 4.")
+                self.console.print("\nInvalid choice. Please enter a number between 1 and 4.")
 
     def prompt_user(self):
         """Prompt the user for their username and password."""
-        print("\nInvestNow - Login")  # Display welcome message
+        self.console.print("\nInvestNow - Login")  # Display welcome message
 
         while True:
             self.users = self.load_users()  # Reload user data from the file
-            username = input("\nEnter your username: ")
+            username = self.console.input("\nEnter your username: ")
             if username in self.users:
-                password = input("Enter your password: ")
+                password = self.console.input("Enter your password: ")
                 if self.users[username]["password"] == password:
-                    print("\nLogin successful.")
+                    self.console.print("\nLogin successful.")
                     self.session.set_current_user(username)  # Save user data in session
                     self.user_menu()
                     break
                 else:
-                    print("\nIncorrect password. Please select an option.")
+                    self.console.print("\nIncorrect password. Please select an option.")
             else:
-                print("\nUsername not found. Please select an option.")
+                self.console.print("\nUsername not found. Please select an option.")
 
             # After an incorrect input, present options
-            print("\nOptions:")
-            print("1. Retry")
-            print("2. Return to Main Menu")
-            print("3. Quit")
+            self.console.print("\nOptions:")
+            self.console.print("1. Retry")
+            self.console.print("2. Return to Main Menu")
+            self.console.print("3. Quit")
 
-            option = input("Enter your choice: ")
+            option = self.console.input("Enter your choice: ")
 
             if option == "1":
                 continue
@@ -90,4 +92,4 @@ class Login:
             elif option == "3":
                 exit()
             else:
-                print("\nInvalid choice. Please enter a number between 1 and 3.")
+                self.console.print("\nInvalid choice. Please enter a number between 1 and 3.")
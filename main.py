@@ -9,55 +9,58 @@ it calls the main() function, which controls the primary application loop.
 from login import Login
 from register import Register
 from session import Session
+from console import Console
 
 
-def print_menu():
+def print_menu(console):
     """
     Prints the main menu for the InvestNow application.
     """
-    print("\nInvestNow - Main Menu")
-    print("1. Login")
-    print("2. Register")
-    print("3. Quit")
+    console.print("\nInvestNow - Main Menu")
+    console.print("1. Login")
+    console.print("2. Register")
+    console.print("3. Quit")
 
 
-def get_choice():
+def get_choice(console):
     """
     Prompts the user for their menu choice and returns it.
     """
     while True:
-        choice = input("Enter your choice: ")
+        choice = console.input("Enter your choice: ")
         if choice in ["1", "2", "3"]:
             return choice
         else:
-            print("\nInvalid choice. Please enter a number between 1 and 3.")
+            console.print("\nInvalid choice. Please enter a number between 1 and 3.")
 
 
-def main():
+def main(console=None):
     """
     The main function of the InvestNow application. 
     It creates instances of the Login and Register classes and provides a loop 
     for the user to choose to login, register, or quit the application.
+    An alternative console, such as a ScriptedConsole, can be passed to drive the session.
     """
+    console = console or Console()
     session = Session()
-    login = Login(session)
-    register = Register()
+    login = Login(session, console)
+    register = Register(console)
 
     while True:
-        print_menu()
+        print_menu(console)
 
         try:
-            choice = get_choice()
+            choice = get_choice(console)
 
             if choice == "1":
                 login.prompt_user()
             elif choice == "2":
                 register.prompt_user()
             elif choice == "3":
-                print("\nClosing InvestNow.")
+                console.print("\nClosing InvestNow.")
                 break
         except SystemExit:
-            print("\nClosing InvestNow.")
+            console.print("\nClosing InvestNow.")
             break
 
 
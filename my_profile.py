@@ -1,17 +1,19 @@
 import json
 from session import Session
+from console import Console
 
 class MyProfile:
     """
     The MyProfile class is responsible for handling the profile operations of a user.
     """
 
-    def __init__(self, session: Session):
+    def __init__(self, session: Session, console: Console = None):
         """
         Initialize the MyProfile class.
         Load the user data from the users.json file into a dictionary.
         """
         self.session = session
+        self.console = console or Console()
         self.file = 'users.json'
         try:
             with open(self.file, encoding='utf-8') as file:
@@ -33,13 +35,13 @@ class MyProfile:
         Ask the user whether to continue or quit.
         """
         while True:
-            continue_choice = input("\nWould you like to continue? (Y/N): ").lower()
+            continue_choice = self.console.input("\nWould you like to continue? (Y/N): ").lower()
             if continue_choice == 'y':
                 break
             elif continue_choice == 'n':
                 return False
             else:
-                print("\nInvalid choice. Please enter Y or N.")
+                self.console.print("\nInvalid choice. Please enter Y or N.")
         return True
 
     def prompt_email(self):
@@ -47,44 +49,44 @@ class MyProfile:
         Prompt the user for a new email.
         """
         while True:
-            email = input("\nEnter your new email: ")
+            email = self.console.input("\nEnter your new email: ")
             if email.strip():
                 return email
             else:
-                print("\nEmail cannot be empty. Please enter a valid email.")
+                self.console.print("\nEmail cannot be empty. Please enter a valid email.")
 
     def prompt_password(self):
         """
         Prompt the user for a new password.
         """
         while True:
-            password = input("\nEnter your new password: ")
+            password = self.console.input("\nEnter your new password: ")
             if password.strip():
                 return password
             else:
-                print("\nPassword cannot be empty. Please enter a valid password.")
+                self.console.print("\nPassword cannot be empty. Please enter a valid password.")
 
     def prompt_age(self):
         """
         Prompt the user for their age.
         """
         while True:
-            age = input("\nEnter your age: ")
+            age = self.console.input("\nEnter your age: ")
             if age.isdigit() and 0 < int(age) <= 150:
                 return age
             else:
-                print("\nInvalid age. Please enter a valid age between 1 and 150.")
+                self.console.print("\nInvalid age. Please enter a valid age between 1 and 150.")
 
     def prompt_risk_tolerance(self):
         """
         Prompt the user for their risk tolerance.
         """
         while True:
-            risk_tolerance = input("\nEnter your risk tolerance (low, medium, high): ")
+            risk_tolerance = self.console.input("\nEnter your risk tolerance (low, medium, high): ")
             if risk_tolerance.lower() in ['low', 'medium', 'high']:
                 return risk_tolerance
             else:
-                print("\nInvalid risk tolerance. Please enter 'low', 'medium', or 'high'.")
+                self.console.print("\nInvalid risk tolerance. Please enter 'low', 'medium', or 'high'.")
 
     def prompt_user(self):
         """
@@ -92,13 +94,13 @@ class MyProfile:
         If the user chooses to update their profile, the user is prompted for the new information.
         """
         while True:
-            print("\nInvestNow - My Profile")
+            self.console.print("\nInvestNow - My Profile")
 
-            print("1. View Profile")
-            print("2. Update Profile")
-            print("3. Return to Menu")
+            self.console.print("1. View Profile")
+            self.console.print("2. Update Profile")
+            self.console.print("3. Return to Menu")
 
-            choice = input("Enter your choice: ")
+            choice = self.console.input("Enter your choice: ")
 
             if choice == "1":
                 self.view_profile()
@@ -109,7 +111,7 @@ class MyProfile:
             elif choice == "3":
                 break
             else:
-                print("\nInvalid choice. Please enter a number between 1 and 3.")
+                self.console.print("\nInvalid choice. Please enter a number between 1 and 3.")
 
     def view_profile(self):
         """
@@ -118,13 +120,13 @@ class MyProfile:
         # Get the username of the currently logged-in user
         current_user = self.session.get_current_user()
 
-        print("\nProfile Details")
-        print("-------------------------")
-        print(f"Username: {current_user}")
-        print(f"Email: {self.users[current_user]['email']}")
-        print(f"\nAge: {self.users[current_user]['age']}")
-        print(f"Risk Tolerance: {self.users[current_user]['risk_tolerance']}")
-        print("-------------------------")
+        self.console.print("\nProfile Details")
+        self.console.print("-------------------------")
+        self.console.print(f"Username: {current_user}")
+        self.console.print(f"Email: {self.users[current_user]['email']}")
+        self.console.print(f"\nAge: {self.users[current_user]['age']}")
+        self.console.print(f"Risk Tolerance: {self.users[current_user]['risk_tolerance']}")
+        self.console.print("-------------------------")
 
     def update_profile(self):
         """
@@ -132,37 +134,37 @@ class MyProfile:
         """
         # Provide options for the user to update their profile
         while True:
-            print("\nUpdate Profile - Options:")
-            print("1. Update Email")
-            print("2. Update Password")
-            print("3. Update Age")
-            print("4. Update Risk Tolerance")
-            print("5. Return to Menu")
+            self.console.print("\nUpdate Profile - Options:")
+            self.console.print("1. Update Email")
+            self.console.print("2. Update Password")
+            self.console.print("3. Update Age")
+            self.console.print("4. Update Risk Tolerance")
+            self.console.print("5. Return to Menu")
 
-            choice = input("Enter your choice: ")
+            choice = self.console.input("Enter your choice: ")
 
             current_user = self.session.get_current_user()
 
             if choice == "1":
                 new_email = self.prompt_email()
                 self.users[current_user]['email'] = new_email
-                print("\nEmail updated successfully.")
+                self.console.print("\nEmail updated successfully.")
             elif choice == "2":
                 new_password = self.prompt_password()
                 self.users[current_user]['password'] = new_password
-                print("\nPassword updated successfully.")
+                self.console.print("\nPassword updated successfully.")
             elif choice == "3":
                 new_age = self.prompt_age()
                 self.users[current_user]['age'] = new_age
-                print("\nAge updated successfully.")
+                self.console.print("\nAge updated successfully.")
             elif choice == "4":
                 new_risk_tolerance = self.prompt_risk_tolerance()
                 self.users[current_user]['risk_tolerance'] = new_risk_tolerance
-                print("\nRisk tolerance updated successfully.")
+                self.console.print("\nRisk tolerance updated successfully.")
             elif choice == "5":
                 break
             else:
-                print("\nInvalid choice. Please enter a number between 1 and 5.")
+                self.console.print("\nInvalid choice. Please enter a number between 1 and 5.")
 
             self.save_users()
 
@@ -1,5 +1,8 @@
 import json
 from prettytable import PrettyTable
+from price_cache import LatestPriceCache
+from console import Console
+from bulk_import import HoldingsImporter
 
 
 class PortfolioAnalysis:
@@ -7,7 +10,7 @@ class PortfolioAnalysis:
     Class to handle portfolio analysis operations for a user.
     """
 
-    def __init__(self, session):
+    def __init__(self, session, console=None):
         """
         Initialize the PortfolioAnalysis object and load users.
 
@@ -15,22 +18,27 @@ class PortfolioAnalysis:
         ----------
         session : Session
             The user's session.
+        console : Console, optional
+            The console used for input and output. Defaults to the terminal.
         """
         self.session = session
+        self.console = console or Console()
         self.user_file = 'users.json'
+        self.price_cache = LatestPriceCache()
 
     def portfolio_menu(self):
         """
         Display the portfolio menu and handle the user's choice.
         """
         while True:
-            print("\nInvestNow - Portfolio Analysis")
-            print("1. View Stocks")
-            print("2. Add Stock Holding")
-            print("3. Remove Stock Holding")
-            print("4. Return to Main Menu")
+            self.console.print("\nInvestNow - Portfolio Analysis")
+            self.console.print("1. View Stocks")
+            self.console.print("2. Add Stock Holding")
+            self.console.print("3. Remove Stock Holding")
+            self.console.print("4. Import Holdings from File")
+            self.console.print("5. Return to Main Menu")
 
-            choice = input("Enter your choice: ")
+            choice = self.console.input("Enter your choice: ")
 
             if choice == "1":
                 self.view_stocks()
@@ -39,10 +47,12 @@ class PortfolioAnalysis:
             elif choice == "3":
                 self.remove_stock()
             elif choice == "4":
-                print("\nReturning to main menu.")
+                self.import_stocks()
+            elif choice == "5":
+                self.console.print("\nReturning to main menu.")
                 return False
             else:
-                print("\nInvalid choice. Please enter a number between 1 and 4.")
+                self.console.print("\nInvalid choice. Please enter a number between 1 and 5.")
             
             if not self.prompt_continue():
                 return False
@@ -60,46 +70,65 @@ class PortfolioAnalysis:
         stocks = users[username]["stocks"]
 
         if stocks:
-            table = PrettyTable(['Symbol', 'Shares', 'Purchase Price'])
+            last_prices = self.price_cache.get_latest([stock['symbol'] for stock in stocks])
+            market_values = {stock['symbol']: stock['shares'] * last_prices[stock['symbol']]
+                             for stock in stocks if stock['symbol'] in last_prices}
+            total_value = sum(market_values.values())
+
+            table = PrettyTable(['Symbol', 'Shares', 'Purchase Price', 'Last Price', 'Market Value',
+                                 'Unrealized P&L', 'Weight'])
             for stock in stocks:
-                table.add_row([stock['symbol'], stock['shares'], stock['purchase_price']])
-            print("\n")
-            print(table)
+                symbol = stock['symbol']
+                if symbol in market_values:
+                    market_value = market_values[symbol]
+                    pnl = market_value - stock['shares'] * stock['purchase_price']
+                    weight = market_value / total_value if total_value else 0.0
+                    table.add_row([symbol, stock['shares'], stock['purchase_price'], f"{last_prices[symbol]:.2f}",
+                                   f"{market_value:.2f}", f"{pnl:.2f}", f"{weight:.2%}"])
+                else:
+                    table.add_row([symbol, stock['shares'], stock['purchase_price'], 'N/A', 'N/A', 'N/A', 'N/A'])
+            self.console.print("\n")
+            self.console.print(table)
+
+            total_cost = sum(stock['shares'] * stock['purchase_price'] for stock in stocks
+                             if stock['symbol'] in market_values)
+            self.console.print(f"Total Market Value: {total_value:.2f}")
+            self.console.print(f"Total Unrealized P&L: {total_value - total_cost:.2f}")
         else:
-            print("\nYou currently have no stocks in your portfolio.")
+            self.console.print("\nYou currently have no stocks in your portfolio.")
 
     def add_stock(self):
         """
         Function to add a stock to user's portfolio.
         """
         while True:
-            symbol = input("\nEnter the stock symbol: ").strip().upper()
+            symbol = self.console.input("\nEnter the stock symbol: ").strip().upper()
             if symbol:
                 break
             else:
-                print("\nStock symbol cannot be empty. Please enter a valid stock symbol.")
+                self.console.print("\nStock symbol cannot be empty. Please enter a valid stock symbol.")
 
         while True:
-            shares = input("Enter the number of shares: ").strip()
+            shares = self.console.input("Enter the number of shares: ").strip()
             try:
                 shares = int(shares)
                 if shares > 0:
                     break
                 else:
-                    print("\nNumber of shares should be a positive non-zero number. Please enter a valid number.")
+                    self.console.print("\nNumber of shares should be a positive non-zero number. Please enter a valid number.")
             except ValueError:
-                print("\nInvalid input. Please enter a number for shares.")
+                self.console.print("\nInvalid input. Please enter a number for shares.")
 
         while True:
-            purchase_price = input("Enter the purchase price: ").strip()
+            purchase_price = self.console.input("Enter the purchase price: ").strip()
             try:
                 purchase_price = float(purchase_price)
                 if purchase_price > 0:
                     break
                 else:
-                    print("\nPurchase price should be a positive non-zero number. Please enter a valid price.")
+                    self.console.print("\nPurchase price should be a positive non-zero number. Please enter a valid price.")
             except ValueError:
-                print("\nInvalid input. Please enter a number for price.")
+                self.console.print("\nInvalid input. Please enter a number for price.")
 
         self._add_stock_to_user(symbol, shares, purchase_price)
 
@@ -108,22 +137,22 @@ class PortfolioAnalysis:
         Function to remove a specific quantity of a stock from user's portfolio.
         """
         while True:
-            symbol = input("\nEnter the stock symbol: ").strip().upper()
+            symbol = self.console.input("\nEnter the stock symbol: ").strip().upper()
             if symbol:
                 break
             else:
-                print("\nStock symbol cannot be empty. Please enter a valid stock symbol.")
+                self.console.print("\nStock symbol cannot be empty. Please enter a valid stock symbol.")
 
         while True:
-            shares_to_remove = input("Enter the number of shares to remove: ").strip()
+            shares_to_remove = self.console.input("Enter the number of shares to remove: ").strip()
             try:
                 shares_to_remove = int(shares_to_remove)
                 if shares_to_remove > 0:
                     break
                 else:
-                    print("\nNumber of shares should be a positive non-zero number. Please enter a valid number.")
+                    self.console.print("\nNumber of shares should be a positive non-zero number. Please enter a valid number.")
             except ValueError:
-                print("\nInvalid input. Please enter a number for shares.")
+                self.console.print("\nInvalid input. Please enter a number for shares.")
 
         users = self.load_users()
         username = self.session.get_current_user()
@@ -131,18 +160,48 @@ class PortfolioAnalysis:
         for stock in users[username]["stocks"]:
             if stock["symbol"].lower() == symbol.lower():
                 if shares_to_remove > stock["shares"]:
-                    print(f"\nYou do not own enough shares of {symbol}. You currently own {stock['shares']} shares.")
+                    self.console.print(f"\nYou do not own enough shares of {symbol}. You currently own {stock['shares']} shares.")
                 elif shares_to_remove == stock["shares"]:
                     users[username]["stocks"].remove(stock)
-                    print(f"\nAll shares of {symbol} have been removed from your portfolio.")
+                    self.console.print(f"\nAll shares of {symbol} have been removed from your portfolio.")
                 else:
                     stock["shares"] -= shares_to_remove
-                    print(f"\n{shares_to_remove} shares of {symbol} have been removed from your portfolio. You now own {stock['shares']} shares.")
+                    self.console.print(f"\n{shares_to_remove} shares of {symbol} have been removed from your portfolio. You now own {stock['shares']} shares.")
 
                 self.save_users(users)
                 return
 
-        print(f"\nStock {symbol} does not exist in your portfolio.")
+        self.console.print(f"\nStock {symbol} does not exist in your portfolio.")
+
+    def import_stocks(self):
+        """
+        Function to import stock holdings in bulk from a broker CSV or JSON export.
+        """
+        while True:
+            path = self.console.input("\nEnter the path of the holdings file (CSV or JSON): ").strip()
+            if path:
+                break
+            else:
+                self.console.print("\nPath cannot be empty. Please enter a valid path.")
+
+        importer = HoldingsImporter(self.user_file)
+        try:
+            positions, rejected = importer.import_file(path, self.session.get_current_user())
+        except FileNotFoundError:
+            self.console.print(f"\nHoldings file {path} not found.")
+            return
+        except OSError as error:
+            self.console.print(f"\nCould not read holdings file {path}: {error.strerror or error}.")
+            return
+        except ValueError as error:
+            self.console.print(f"\n{error}")
+            return
+
+        self.console.print(f"\nImported {positions} positions into your portfolio.")
+        if not rejected.empty:
+            self.console.print(f"{len(rejected)} rows were rejected:")
+            for row_number, reason in rejected['reason'].items():
+                self.console.print(f"{rejected.index.name.capitalize()} {row_number}: {reason}")
 
     def _add_stock_to_user(self, symbol, shares, purchase_price):
         """
@@ -158,7 +217,7 @@ class PortfolioAnalysis:
                 weighted_price = round(weighted_price, 2)  # Rounded to 2 decimal places
                 stock["shares"] = total_shares
                 stock["purchase_price"] = weighted_price
-                print(f"\nAdded {shares} shares of {symbol} to your portfolio. You now own {total_shares} shares with a weighted purchase price of {weighted_price}.")
+                self.console.print(f"\nAdded {shares} shares of {symbol} to your portfolio. You now own {total_shares} shares with a weighted purchase price of {weighted_price}.")
                 self.save_users(users)
                 return
 
@@ -170,7 +229,7 @@ class PortfolioAnalysis:
 
         users[username]["stocks"].append(new_stock)
         self.save_users(users)
-        print(f"\nAdded {shares} shares of {symbol} to your portfolio at a purchase price of {purchase_price}.")
+        self.console.print(f"\nAdded {shares} shares of {symbol} to your portfolio at a purchase price of {purchase_price}.")
 
     def save_users(self, users):
         """
@@ -194,10 +253,10 @@ class PortfolioAnalysis:
         Ask the user whether to continue or quit.
         """
         while True:
-            continue_choice = input("\nWould you like to continue? (Y/N): ").lower()
+            continue_choice = self.console.input("\nWould you like to continue? (Y/N): ").lower()
             if continue_choice == 'y':
                 return True
             elif continue_choice == 'n':
                 return False
             else:
-                print("\nInvalid choice. Please enter Y or N.")
+                self.console.print("\nInvalid choice. Please enter Y or N.")
@@ -0,0 +1,145 @@
+"""
+price_cache.py: This module provides the LatestPriceCache class, which keeps the latest known
+price of every symbol in a local JSON file. Stale or missing symbols are refreshed together in
+one batched lookup over the last few trading days, so valuing a portfolio never depends on the
+length of the analysis time horizon. Several InvestNow processes may share the cache file: every
+write merges into the current file under a lock and replaces it atomically.
+"""
+
+import json
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from fetch_scheduler import default_scheduler
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+class LatestPriceCache:
+    """
+    Class to look up the latest prices of symbols through a local cache file.
+    """
+
+    def __init__(self, cache_file='prices.json', max_age=900, lookback_days=10):
+        """
+        Initialize the LatestPriceCache.
+
+        Parameters
+        ----------
+        cache_file : str
+            The JSON file holding the cached prices.
+        max_age : float
+            Seconds after which a cached price is refreshed.
+        lookback_days : int
+            Number of calendar days fetched to find the latest trading day's price.
+        """
+        self.cache_file = cache_file
+        self.max_age = max_age
+        self.lookback_days = lookback_days
+
+    def load_prices(self):
+        """
+        Load the cached prices from the json file.
+        """
+        try:
+            with open(self.cache_file, encoding='utf-8') as file:
+                return json.load(file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    @contextmanager
+    def _locked(self):
+        """
+        Internal context manager holding an exclusive lock on the cache file across processes.
+        """
+        with open(self.cache_file + '.lock', 'a+', encoding='utf-8') as lock:
+            if fcntl is not None:
+                fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+            else:
+                lock.seek(0)
+                msvcrt.locking(lock.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock.fileno(), fcntl.LOCK_UN)
+                else:
+                    lock.seek(0)
+                    msvcrt.locking(lock.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def save_prices(self, prices):
+        """
+        Merge prices into the json file, keeping the most recently fetched price of each symbol.
+
+        The file is re-read under a lock and replaced atomically, so concurrent processes
+        neither lose each other's updates nor see a partially written file.
+        """
+        with self._locked():
+            cache = self.load_prices()
+            for symbol, entry in prices.items():
+                if symbol not in cache or cache[symbol]['fetched_at'] <= entry['fetched_at']:
+                    cache[symbol] = entry
+            directory = os.path.dirname(os.path.abspath(self.cache_file))
+            with tempfile.NamedTemporaryFile('w', encoding='utf-8', dir=directory, suffix='.tmp',
+                                             delete=False) as file:
+                json.dump(cache, file)
+            os.replace(file.name, self.cache_file)
+
+    def update(self, prices):
+        """
+        Store prices obtained elsewhere, for instance from a price tick stream.
+
+        Parameters
+        ----------
+        prices : dict
+            Maps a symbol to its latest price.
+        """
+        now = time.time()
+        self.save_prices({symbol.upper(): {'price': float(price), 'fetched_at': now}
+                          for symbol, price in prices.items()})
+
+    def get_latest(self, symbols):
+        """
+        Return the latest prices of the given symbols.
+
+        Cached prices younger than max_age are used as they are. All other symbols are
+        refreshed in one batch and written back to the cache in a single save.
+
+        Parameters
+        ----------
+        symbols : list of str
+            The ticker symbols.
+
+        Returns
+        -------
+        dict
+            Maps each symbol to its latest price. Symbols without any price data are left out.
+        """
+        cache = self.load_prices()
+        now = time.time()
+        stale = [symbol for symbol in dict.fromkeys(symbols)
+                 if symbol not in cache or now - cache[symbol]['fetched_at'] > self.max_age]
+
+        if stale:
+            end = datetime.today() + timedelta(days=1)
+            start = end - timedelta(days=self.lookback_days)
+            futures = default_scheduler().submit_many(stale, start.strftime('%Y-%m-%d'), end.strftime('%Y-%m-%d'))
+            refreshed = {}
+            for symbol, future in futures.items():
+                try:
+                    prices = future.result().dropna()
+                except Exception:  # pylint: disable=broad-except
+                    continue  # Fall back to an older cached price, if any
+                if not prices.empty:
+                    refreshed[symbol] = {'price': float(prices.iloc[-1]), 'fetched_at': now}
+            if refreshed:
+                cache.update(refreshed)
+                self.save_prices(refreshed)
+
+        return {symbol: cache[symbol]['price'] for symbol in symbols if symbol in cache}
@@ -0,0 +1,345 @@
+"""
+price_service.py: This module provides a local price service shared by all of a user's InvestNow
+processes on a host. The PriceService daemon owns a single price cache and serves batched price
+and return slices over a Unix domain socket using a compact binary protocol. PriceServiceClient
+is used by TradingAlgorithm, which falls back to fetching prices itself when no service is running.
+
+The socket lives in a directory only its user can access ($XDG_RUNTIME_DIR, or a 0700 directory in
+the temp directory), and clients only talk to a socket owned by their own user, so other users
+on the host cannot serve prices to them.
+
+Run the service with: python price_service.py [--socket PATH]
+
+Protocol (little-endian). A request is a header followed by the symbols joined by newlines:
+    magic b'INVP' | op (u8) | start 'YYYY-MM-DD' | end 'YYYY-MM-DD' | payload length (u32)
+A response is a header followed by the column names joined by newlines, the dates as int64
+nanoseconds and the values as a row-major float64 matrix, or by an error message:
+    magic b'INVP' | status (u8) | rows (u32) | columns (u32) | names length (u32) | payload length (u32)
+"""
+
+import argparse
+import os
+import socketserver
+import socket
+import stat
+import struct
+import tempfile
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+from fetch_scheduler import default_scheduler
+from returns_alignment import daily_returns
+
+MAGIC = b'INVP'
+REQUEST_HEADER = struct.Struct('<4sB10s10sI')
+RESPONSE_HEADER = struct.Struct('<4sBIIII')
+
+OP_PING = 0
+OP_PRICES = 1
+OP_RETURNS = 2
+
+STATUS_OK = 0
+STATUS_ERROR = 1
+
+
+
+class PriceServiceError(Exception):
+    """Raised when the price service cannot answer a request."""
+
+
+def require_unix_sockets():
+    """
+    Raise PriceServiceError on platforms without Unix domain sockets or user ids, such as Windows,
+    where the price service is not available and callers fetch prices directly.
+    """
+    if not hasattr(socket, 'AF_UNIX') or not hasattr(os, 'getuid'):
+        raise PriceServiceError("The price service needs Unix domain sockets, which this platform lacks.")
+
+
+def default_socket_path():
+    """
+    Return the socket path of the current user's price service.
+
+    INVESTNOW_PRICE_SOCKET overrides the path. Otherwise the socket is placed in $XDG_RUNTIME_DIR,
+    or in a private investnow-<uid> directory in the temp directory, which is created with mode 0700.
+
+    Raises
+    ------
+    PriceServiceError
+        If the platform has no Unix domain sockets, or the private directory exists but belongs
+        to another user or is accessible to others.
+    """
+    require_unix_sockets()
+    if os.environ.get('INVESTNOW_PRICE_SOCKET'):
+        return os.environ['INVESTNOW_PRICE_SOCKET']
+    runtime_dir = os.environ.get('XDG_RUNTIME_DIR')
+    if not runtime_dir or not os.path.isdir(runtime_dir):
+        runtime_dir = os.path.join(tempfile.gettempdir(), f"investnow-{os.getuid()}")
+        try:
+            os.mkdir(runtime_dir, 0o700)
+        except FileExistsError:
+            pass
+        info = os.lstat(runtime_dir)
+        if not stat.S_ISDIR(info.st_mode) or info.st_uid != os.getuid() or info.st_mode & 0o077:
+            raise PriceServiceError(f"{runtime_dir} is not a private directory of the current user.")
+    return os.path.join(runtime_dir, 'investnow-prices.sock')
+
+
+def check_socket_owner(socket_path):
+    """
+    Raise PriceServiceError unless the socket is owned by the current user.
+    """
+    if os.stat(socket_path).st_uid != os.getuid():
+        raise PriceServiceError(f"{socket_path} is not owned by the current user.")
+
+
+def _recv_exactly(conn, size):
+    """
+    Read exactly size bytes from a socket.
+    """
+    chunks = []
+    while size:
+        chunk = conn.recv(min(size, 1 << 20))
+        if not chunk:
+            raise ConnectionError("Price service connection closed.")
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b''.join(chunks)
+
+
+def encode_frame(frame):
+    """
+    Encode a price or returns frame as a response body.
+
+    Returns
+    -------
+    tuple
+        The (header, body) bytes.
+    """
+    names = '\n'.join(frame.columns).encode('utf-8')
+    dates = frame.index.values.astype('datetime64[ns]').astype('<i8').tobytes()
+    values = np.ascontiguousarray(frame.to_numpy(dtype='<f8')).tobytes()
+    body = names + dates + values
+    header = RESPONSE_HEADER.pack(MAGIC, STATUS_OK, len(frame.index), len(frame.columns), len(names), len(body))
+    return header, body
+
+
+def decode_frame(rows, columns, names_length, body):
+    """
+    Decode a response body into a frame indexed by date.
+    """
+    names = body[:names_length].decode('utf-8').split('\n') if columns else []
+    dates_end = names_length + rows * 8
+    dates = np.frombuffer(body[names_length:dates_end], dtype='<i8').astype('datetime64[ns]')
+    values = np.frombuffer(body[dates_end:], dtype='<f8').reshape(rows, columns)
+    return pd.DataFrame(values, index=pd.DatetimeIndex(dates, name='Date'), columns=names)
+
+
+class PriceService:
+    """
+    The PriceService class owns the price cache and answers requests from every client.
+    """
+
+    def __init__(self, socket_path=None, max_entries=1024):
+        """
+        Initialize the PriceService.
+
+        Parameters
+        ----------
+        socket_path : str, optional
+            The Unix domain socket to listen on. Defaults to default_socket_path().
+        max_entries : int
+            Maximum number of (symbol, start, end) price series kept in the cache.
+        """
+        require_unix_sockets()
+        self.socket_path = socket_path or default_socket_path()
+        self.max_entries = max_entries
+        self._cache = OrderedDict()  # (symbol, start, end) -> pandas.Series
+        self._lock = threading.Lock()
+        self._server = None
+
+    def get_prices(self, symbols, start, end):
+        """
+        Return the prices of the symbols, fetching only those missing from the cache.
+
+        Returns
+        -------
+        pandas.DataFrame
+            The prices indexed by date, with one column per symbol in the requested order.
+        """
+        with self._lock:
+            cached = {symbol: self._cache[(symbol, start, end)] for symbol in symbols
+                      if (symbol, start, end) in self._cache}
+            for symbol in cached:
+                self._cache.move_to_end((symbol, start, end))
+
+        missing = [symbol for symbol in dict.fromkeys(symbols) if symbol not in cached]
+        if missing:
+            fetched = default_scheduler().fetch(missing, start, end)
+            with self._lock:
+                for symbol in missing:
+                    cached[symbol] = fetched[symbol].dropna()
+                    self._cache[(symbol, start, end)] = cached[symbol]
+                while len(self._cache) > self.max_entries:
+                    self._cache.popitem(last=False)
+
+        return pd.concat([cached[symbol].rename(symbol) for symbol in symbols], axis=1).sort_index()
+
+    def get_returns(self, symbols, start, end):
+        """
+        Return the daily returns of the symbols, as defined by returns_alignment.daily_returns.
+        """
+        return daily_returns(self.get_prices(symbols, start, end))
+
+    def handle(self, conn):
+        """
+        Answer every request sent on a client connection until it closes.
+        """
+        while True:
+            try:
+                header = _recv_exactly(conn, REQUEST_HEADER.size)
+            except ConnectionError:
+                return
+            magic, op, start, end, length = REQUEST_HEADER.unpack(header)
+            payload = _recv_exactly(conn, length)
+            if magic != MAGIC:
+                return
+
+            try:
+                if op == OP_PING:
+                    frame = pd.DataFrame()
+                else:
+                    symbols = payload.decode('utf-8').split('\n') if payload else []
+                    start, end = start.rstrip(b'\0').decode('ascii'), end.rstrip(b'\0').decode('ascii')
+                    if op == OP_PRICES:
+                        frame = self.get_prices(symbols, start, end)
+                    elif op == OP_RETURNS:
+                        frame = self.get_returns(symbols, start, end)
+                    else:
+                        raise PriceServiceError(f"Unknown operation {op}.")
+                header, body = encode_frame(frame)
+            except Exception as error:  # pylint: disable=broad-except
+                body = str(error).encode('utf-8')
+                header = RESPONSE_HEADER.pack(MAGIC, STATUS_ERROR, 0, 0, 0, len(body))
+            conn.sendall(header + body)
+
+    def serve_forever(self):
+        """
+        Listen on the Unix domain socket until shutdown is called.
+
+        Raises
+        ------
+        PriceServiceError
+            If another price service is already answering on the socket.
+        """
+        if os.path.exists(self.socket_path):
+            if PriceServiceClient(self.socket_path, timeout=2.0).is_running():
+                raise PriceServiceError(f"A price service is already running on {self.socket_path}.")
+            os.remove(self.socket_path)  # Left over by a service that did not shut down cleanly
+
+        service = self
+
+        class Handler(socketserver.BaseRequestHandler):
+            def handle(self):
+                service.handle(self.request)
+
+        self._server = socketserver.ThreadingUnixStreamServer(self.socket_path, Handler)
+        os.chmod(self.socket_path, 0o600)
+        self._server.daemon_threads = True
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+            if os.path.exists(self.socket_path):
+                os.remove(self.socket_path)
+
+    def shutdown(self):
+        """Stop serving requests."""
+        if self._server is not None:
+            self._server.shutdown()
+
+
+class PriceServiceClient:
+    """
+    The PriceServiceClient class requests prices and returns from a running PriceService.
+    """
+
+    def __init__(self, socket_path=None, timeout=30.0):
+        """
+        Initialize the PriceServiceClient.
+
+        Parameters
+        ----------
+        socket_path : str, optional
+            The Unix domain socket of the service. Defaults to default_socket_path().
+        timeout : float
+            Seconds to wait for a response.
+        """
+        require_unix_sockets()
+        self.socket_path = socket_path or default_socket_path()
+        self.timeout = timeout
+
+    def is_running(self):
+        """Return whether a price service answers on the socket."""
+        if not os.path.exists(self.socket_path):
+            return False
+        try:
+            self._request(OP_PING, [], '', '')
+            return True
+        except (OSError, PriceServiceError):
+            return False
+
+    def _request(self, op, symbols, start, end):
+        """
+        Internal method to send one request and decode its response.
+        Only a socket owned by the current user is trusted.
+        """
+        check_socket_owner(self.socket_path)
+        payload = '\n'.join(symbols).encode('utf-8')
+        request = REQUEST_HEADER.pack(MAGIC, op, start.encode('ascii'), end.encode('ascii'), len(payload))
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conn:
+            conn.settimeout(self.timeout)
+            conn.connect(self.socket_path)
+            conn.sendall(request + payload)
+            magic, status, rows, columns, names_length, length = RESPONSE_HEADER.unpack(
+                _recv_exactly(conn, RESPONSE_HEADER.size))
+            body = _recv_exactly(conn, length)
+        if magic != MAGIC:
+            raise PriceServiceError("Invalid response from the price service.")
+        if status != STATUS_OK:
+            raise PriceServiceError(body.decode('utf-8'))
+        return decode_frame(rows, columns, names_length, body)
+
+    def get_prices(self, symbols, start, end):
+        """
+        Return the prices of the symbols between start (inclusive) and end (exclusive).
+
+        Returns
+        -------
+        pandas.DataFrame
+            The prices indexed by date, with one column per symbol in the requested order.
+        """
+        return self._request(OP_PRICES, symbols, start, end)
+
+    def get_returns(self, symbols, start, end):
+        """
+        Return the daily returns of the symbols between start (inclusive) and end (exclusive).
+        """
+        return self._request(OP_RETURNS, symbols, start, end)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the InvestNow local price service.")
+    parser.add_argument('--socket', help="Unix domain socket to listen on")
+    args = parser.parse_args()
+
+    service = PriceService(args.socket)
+    print(f"InvestNow price service listening on {service.socket_path}")
+    try:
+        service.serve_forever()
+    except PriceServiceError as error:
+        print(error)
+        raise SystemExit(1)
+    except KeyboardInterrupt:
+        print("\nPrice service stopped.")
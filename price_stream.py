@@ -0,0 +1,368 @@
+"""
+price_stream.py: This module provides the live-valuation mode for the InvestNow application.
+It consumes a stream of (symbol, price) ticks from a pluggable source, such as a tailed
+local file or a local socket, and keeps every subscribed user's holding values, portfolio
+total and weights up to date incrementally, one tick at a time.
+"""
+
+import argparse
+import json
+import socket
+import threading
+import time
+
+
+def parse_tick(line):
+    """
+    Parse a single 'SYMBOL,PRICE' line into a tick.
+
+    Parameters
+    ----------
+    line : str
+        The raw line read from a tick source.
+
+    Returns
+    -------
+    tuple or None
+        The (symbol, price) pair, or None if the line is blank or malformed.
+    """
+    parts = line.strip().split(',')
+    if len(parts) != 2:
+        return None
+    symbol = parts[0].strip().upper()
+    try:
+        price = float(parts[1])
+    except ValueError:
+        return None
+    if not symbol or price <= 0:
+        return None
+    return symbol, price
+
+
+class FileTickSource:
+    """
+    Tick source that tails a local text file containing one 'SYMBOL,PRICE' line per tick.
+    """
+
+    def __init__(self, path, poll_interval=0.5, from_start=True):
+        """
+        Initialize the FileTickSource.
+
+        Parameters
+        ----------
+        path : str
+            The file to tail.
+        poll_interval : float
+            Seconds to wait before checking the file again when no new line is available.
+        from_start : bool
+            Whether to replay the lines already in the file before tailing new ones.
+        """
+        self.path = path
+        self.poll_interval = poll_interval
+        self.from_start = from_start
+        self._stopped = threading.Event()
+
+    def stop(self):
+        """Stop producing ticks."""
+        self._stopped.set()
+
+    def ticks(self):
+        """Yield (symbol, price) ticks until the source is stopped."""
+        with open(self.path, encoding='utf-8') as file:
+            if not self.from_start:
+                file.seek(0, 2)
+            buffer = ''
+            while not self._stopped.is_set():
+                chunk = file.readline()
+                if not chunk:
+                    time.sleep(self.poll_interval)
+                    continue
+                buffer += chunk
+                if not buffer.endswith('\n'):
+                    continue  # Wait for the writer to finish the line
+                tick = parse_tick(buffer)
+                buffer = ''
+                if tick:
+                    yield tick
+
+
+class SocketTickSource:
+    """
+    Tick source that connects to a local TCP socket sending one 'SYMBOL,PRICE' line per tick.
+    """
+
+    def __init__(self, host='127.0.0.1', port=9009):
+        """
+        Initialize the SocketTickSource.
+
+        Parameters
+        ----------
+        host : str
+            The host to connect to.
+        port : int
+            The port to connect to.
+        """
+        self.host = host
+        self.port = port
+        self._stopped = threading.Event()
+
+    def stop(self):
+        """Stop producing ticks."""
+        self._stopped.set()
+
+    def ticks(self):
+        """Yield (symbol, price) ticks until the source is stopped or the peer disconnects."""
+        with socket.create_connection((self.host, self.port)) as conn:
+            conn.settimeout(0.5)
+            with conn.makefile('r', encoding='utf-8') as stream:
+                while not self._stopped.is_set():
+                    try:
+                        line = stream.readline()
+                    except socket.timeout:
+                        continue
+                    if not line:
+                        return
+                    tick = parse_tick(line)
+                    if tick:
+                        yield tick
+
+
+class LivePortfolioValuation:
+    """
+    The LivePortfolioValuation class keeps portfolio valuations current as price ticks arrive.
+    A symbol -> holders index routes each tick only to the users holding that symbol, and each
+    affected portfolio total is patched by the change in value of that single holding.
+    """
+
+    def __init__(self):
+        """Initialize an empty valuation with no subscribed users."""
+        self._holdings = {}  # username -> {symbol: {'shares', 'price', 'value'}}
+        self._totals = {}  # username -> portfolio value
+        self._holders = {}  # symbol -> set of usernames
+        self._last_prices = {}  # symbol -> last tick price
+        self._lock = threading.Lock()
+
+    def subscribe(self, username, stocks, last_prices=None):
+        """
+        Start tracking a user's holdings.
+
+        Holdings are marked at the last seen tick for their symbol, or else at the given last
+        price. Holdings with neither stay unpriced, and out of the portfolio total, until the
+        first tick for their symbol arrives.
+
+        Parameters
+        ----------
+        username : str
+            The user to track.
+        stocks : list of dict
+            The user's stocks as stored in users.json.
+        last_prices : dict, optional
+            Maps a symbol to its latest known market price, e.g. from LatestPriceCache.
+        """
+        last_prices = {symbol.upper(): price for symbol, price in (last_prices or {}).items()}
+        with self._lock:
+            self._unsubscribe(username)
+            holdings = {}
+            for stock in stocks:
+                symbol = stock['symbol'].upper()
+                price = self._last_prices.get(symbol, last_prices.get(symbol))
+                holdings[symbol] = {
+                    'shares': stock['shares'],
+                    'price': price,
+                    'value': stock['shares'] * price if price is not None else 0.0
+                }
+                self._holders.setdefault(symbol, set()).add(username)
+            self._holdings[username] = holdings
+            self._totals[username] = sum(holding['value'] for holding in holdings.values())
+
+    def subscribe_from_file(self, usernames=None, user_file='users.json', price_lookup=None):
+        """
+        Start tracking many users at once, reading their holdings from the user file.
+
+        Parameters
+        ----------
+        usernames : list of str, optional
+            The users to track. Defaults to every user in the user file.
+        user_file : str
+            The JSON file holding the user data.
+        price_lookup : callable, optional
+            Called once with the symbols held by the tracked users and returning a mapping of
+            symbol to latest market price, e.g. LatestPriceCache().get_latest.
+
+        Returns
+        -------
+        list of str
+            The users now tracked. Users missing from the user file are skipped.
+        """
+        with open(user_file, encoding='utf-8') as file:
+            users = json.load(file)
+        usernames = [username for username in (users if usernames is None else usernames) if username in users]
+        last_prices = None
+        if price_lookup is not None:
+            symbols = {stock['symbol'].upper() for username in usernames for stock in users[username]['stocks']}
+            last_prices = price_lookup(sorted(symbols))
+        for username in usernames:
+            self.subscribe(username, users[username]['stocks'], last_prices)
+        return usernames
+
+    def unsubscribe(self, username):
+        """
+        Stop tracking a user's holdings.
+
+        Parameters
+        ----------
+        username : str
+            The user to stop tracking.
+        """
+        with self._lock:
+            self._unsubscribe(username)
+
+    def _unsubscribe(self, username):
+        """
+        Internal method to remove a user from the index. The caller must hold the lock.
+        """
+        for symbol in self._holdings.pop(username, {}):
+            holders = self._holders.get(symbol)
+            if holders is not None:
+                holders.discard(username)
+                if not holders:
+                    del self._holders[symbol]
+        self._totals.pop(username, None)
+
+    def on_tick(self, symbol, price):
+        """
+        Apply a price tick to every portfolio holding the symbol.
+
+        Parameters
+        ----------
+        symbol : str
+            The ticker symbol.
+        price : float
+            The new price.
+
+        Returns
+        -------
+        list of str
+            The users whose portfolio value changed.
+        """
+        symbol = symbol.upper()
+        with self._lock:
+            self._last_prices[symbol] = price
+            holders = self._holders.get(symbol)
+            if not holders:
+                return []
+            for username in holders:
+                holding = self._holdings[username][symbol]
+                new_value = holding['shares'] * price
+                self._totals[username] += new_value - holding['value']
+                holding['price'] = price
+                holding['value'] = new_value
+            return list(holders)
+
+    def get_total(self, username):
+        """Return the current portfolio value of a user."""
+        with self._lock:
+            return self._totals[username]
+
+    def get_value(self, username, symbol):
+        """Return the current value of one of a user's holdings."""
+        with self._lock:
+            return self._holdings[username][symbol.upper()]['value']
+
+    def get_weight(self, username, symbol):
+        """Return the current weight of one of a user's holdings."""
+        with self._lock:
+            total = self._totals[username]
+            value = self._holdings[username][symbol.upper()]['value']
+            return value / total if total else 0.0
+
+    def get_weights(self, username):
+        """
+        Return the current weights of all of a user's holdings.
+
+        Returns
+        -------
+        dict
+            A mapping of symbol to portfolio weight.
+        """
+        with self._lock:
+            total = self._totals[username]
+            return {symbol: (holding['value'] / total if total else 0.0)
+                    for symbol, holding in self._holdings[username].items()}
+
+    def get_unpriced(self, username):
+        """Return the symbols of a user's holdings that have no price yet."""
+        with self._lock:
+            return [symbol for symbol, holding in self._holdings[username].items() if holding['price'] is None]
+
+    def get_holdings(self, username):
+        """
+        Return a snapshot of a user's holdings.
+
+        Returns
+        -------
+        dict
+            A mapping of symbol to a dictionary with 'shares', 'price' and 'value'.
+            The price is None for holdings that have no price yet.
+        """
+        with self._lock:
+            return {symbol: dict(holding) for symbol, holding in self._holdings[username].items()}
+
+    def run(self, source, on_update=None, price_cache=None):
+        """
+        Consume ticks from a source until it is exhausted or stopped.
+
+        Parameters
+        ----------
+        source : FileTickSource or SocketTickSource
+            Any object with a ticks() generator of (symbol, price) pairs.
+        on_update : callable, optional
+            Called as on_update(username, symbol) for every portfolio a tick changed.
+        price_cache : LatestPriceCache, optional
+            Receives the last tick price of every symbol seen when the stream ends, in a single
+            write, so other views pick up the streamed prices.
+        """
+        streamed = {}  # symbol -> last tick price of this run
+        try:
+            for symbol, price in source.ticks():
+                streamed[symbol] = price
+                updated = self.on_tick(symbol, price)
+                if on_update:
+                    for username in updated:
+                        on_update(username, symbol)
+        finally:
+            if price_cache is not None and streamed:
+                price_cache.update(streamed)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Value InvestNow accounts live from a stream of price ticks.")
+    source_group = parser.add_mutually_exclusive_group(required=True)
+    source_group.add_argument('--tick-file', help="local file with one 'SYMBOL,PRICE' line per tick")
+    source_group.add_argument('--port', type=int, help="local TCP port sending one 'SYMBOL,PRICE' line per tick")
+    parser.add_argument('--user-file', default='users.json', help="JSON file holding the user data")
+    parser.add_argument('--users', nargs='+', help="accounts to track, every account by default")
+    parser.add_argument('--no-prices', action='store_true',
+                        help="leave holdings unpriced until their first tick instead of fetching latest prices")
+    args = parser.parse_args()
+
+    valuation = LivePortfolioValuation()
+    price_cache = None
+    price_lookup = None
+    if not args.no_prices:
+        from price_cache import LatestPriceCache
+        price_cache = LatestPriceCache()
+        price_lookup = price_cache.get_latest
+    tracked = valuation.subscribe_from_file(args.users, args.user_file, price_lookup)
+    print(f"Tracking {len(tracked)} accounts. Press Ctrl+C to stop.")
+
+    def print_update(username, symbol):
+        print(f"{username}: {symbol} value {valuation.get_value(username, symbol):.2f}, "
+              f"weight {valuation.get_weight(username, symbol):.4f} | "
+              f"Portfolio value: {valuation.get_total(username):.2f}")
+
+    source = FileTickSource(args.tick_file) if args.tick_file else SocketTickSource(port=args.port)
+    try:
+        valuation.run(source, on_update=print_update, price_cache=price_cache)
+    except KeyboardInterrupt:
+        source.stop()
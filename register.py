@@ -5,6 +5,7 @@ writes new user data to a JSON file.
 """
 
 import json
+from console import Console
 
 
 class Register:
@@ -14,12 +15,13 @@ class Register:
     and writing the new user data to a JSON file.
     """
 
-    def __init__(self):
+    def __init__(self, console: Console = None):
         """
         Initialize the Register class.
         Load the user data from the users.json file into a dictionary.
         If the file is not found, an empty dictionary is created instead.
         """
+        self.console = console or Console()
         self.file = 'users.json'
         self.users = self.load_users()
 
@@ -39,46 +41,46 @@ class Register:
         Prompt the user to enter their username.
         """
         while True:
-            username = input("Enter your username: ")
+            username = self.console.input("Enter your username: ")
             if username.strip():
                 return username
             else:
-                print("\nUsername cannot be empty. Please enter a valid username.")
+                self.console.print("\nUsername cannot be empty. Please enter a valid username.")
 
     def prompt_password(self):
         """
         Prompt the user to enter their password.
         """
         while True:
-            password = input("Enter your password: ")
+            password = self.console.input("Enter your password: ")
             if password.strip():
                 return password
             else:
-                print("\nPassword cannot be empty. Please enter a valid password.")
+                self.console.print("\nPassword cannot be empty. Please enter a valid password.")
 
     def prompt_email(self):
         """
         Prompt the user to enter their email.
         """
         while True:
-            email = input("Enter your email: ")
+            email = self.console.input("Enter your email: ")
             if email.strip():
                 return email
             else:
-                print("\nEmail cannot be empty. Please enter a valid email.")
+                self.console.print("\nEmail cannot be empty. Please enter a valid email.")
 
     def prompt_continue(self):
         """
         Ask the user whether to continue or quit.
         """
         while True:
-            continue_choice = input("Would you like to continue? (Y/N): ").lower()
+            continue_choice = self.console.input("Would you like to continue? (Y/N): ").lower()
             if continue_choice == 'y':
                 break
             elif continue_choice == 'n':
                 raise SystemExit
             else:
-                print("\nInvalid choice. Please enter Y or N.")
+                self.console.print("\nInvalid choice. Please enter Y or N.")
 
     def prompt_user(self):
         """
@@ -87,12 +89,12 @@ class Register:
         the user is asked to try again with a different username.
         After successful registration, the user is given a choice to continue or quit.
         """
-        print("\nInvestNow - Registration")  # Display welcome message.
+        self.console.print("\nInvestNow - Registration")  # Display welcome message.
 
         while True:
             username = self.prompt_username()
             if username in self.users:
-                print("\nUsername already taken. Please try another one.")
+                self.console.print("\nUsername already taken. Please try another one.")
             else:
                 break
 
@@ -105,6 +107,6 @@ class Register:
         with open(self.file, 'w', encoding='utf-8') as file:
             json.dump(self.users, file)
 
-        print("\nRegistration successful. Welcome to InvestNow.")
+        self.console.print("\nRegistration successful. Welcome to InvestNow.")
 
         self.prompt_continue()
@@ -0,0 +1,239 @@
+"""
+returns_alignment.py: This module aligns ragged return histories for the InvestNow application.
+When holdings listed on different dates, their return columns start with NaNs. The
+pairwise_complete_stats function computes per-asset means and a pairwise-complete covariance
+in one vectorized pass over the NaN mask, so no asset's history is dropped to line the others
+up, and optionally projects the covariance to the nearest positive semidefinite matrix so that
+portfolio variances can never be negative. An asset with too few returns in the horizon has no
+variance at all, so InsufficientHistoryError is raised instead of returning NaN statistics.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def daily_returns(prices):
+    """
+    Compute the daily simple returns of every asset over its own trading days.
+
+    Each return is the change from the asset's previous available price, so a missing price is
+    folded into the next return instead of turning it into NaN, and an asset's returns do not
+    depend on which other assets are in the frame. This is the one definition of returns used by
+    TradingAlgorithm, IncrementalReturnStats and the price service.
+
+    Parameters
+    ----------
+    prices : pandas.DataFrame
+        Prices indexed by date, one column per asset, NaN where an asset has no price.
+
+    Returns
+    -------
+    pandas.DataFrame
+        The returns on the union of the days any asset has a return, NaN where an asset has none.
+    """
+    columns = {symbol: prices[symbol].dropna().pct_change().iloc[1:] for symbol in prices.columns}
+    return pd.DataFrame(columns, columns=prices.columns, dtype=np.float64).sort_index()
+
+
+class InsufficientHistoryError(ValueError):
+    """
+    Raised when assets have too few daily returns in the time horizon to estimate their variance.
+    """
+
+    def __init__(self, symbols, min_periods):
+        self.symbols = list(symbols)
+        self.min_periods = min_periods
+        super().__init__(f"Not enough price history for {', '.join(self.symbols)} in the time horizon "
+                         f"(at least {min_periods} daily returns are needed). "
+                         "Widen the time horizon or remove the holding.")
+
+
+def check_history(symbols, counts, min_periods=2):
+    """
+    Raise InsufficientHistoryError if any asset has fewer than min_periods returns.
+
+    Parameters
+    ----------
+    symbols : list of str
+        The asset symbols, in the order of the counts.
+    counts : numpy.ndarray
+        Number of days both assets have a return, per pair of assets.
+    min_periods : int
+        Minimum number of returns per asset.
+    """
+    short = [symbol for symbol, count in zip(symbols, np.diag(counts)) if count < min_periods]
+    if short:
+        raise InsufficientHistoryError(short, min_periods)
+
+
+class ReturnStats:
+    """
+    The ReturnStats class holds the per-asset means and the covariance of daily returns.
+    """
+
+    def __init__(self, symbols, mean, cov, counts):
+        """
+        Initialize the ReturnStats.
+
+        Parameters
+        ----------
+        symbols : list of str
+            The asset symbols, in the order of the arrays.
+        mean : numpy.ndarray
+            Per-asset mean daily return over each asset's own history.
+        cov : numpy.ndarray
+            Daily return covariance, each entry over the days both assets have a return.
+        counts : numpy.ndarray
+            Number of days both assets have a return, per pair of assets.
+        """
+        self.symbols = list(symbols)
+        self.mean = mean
+        self.cov = cov
+        self.counts = counts
+
+    def correlation(self):
+        """
+        Return the correlation matrix implied by the covariance.
+
+        Returns
+        -------
+        pandas.DataFrame
+            The correlation matrix, indexed by symbol on both axes.
+        """
+        std = np.sqrt(np.diag(self.cov))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            corr = self.cov / np.outer(std, std)
+        return pd.DataFrame(corr, index=self.symbols, columns=self.symbols)
+
+
+def nearest_psd(cov, eps=0.0):
+    """
+    Project a covariance matrix to the nearest positive semidefinite matrix with the same variances.
+
+    The eigenvalues of the correlation matrix are clipped at eps and the result is rescaled to a
+    unit diagonal before the variances are restored.
+
+    Parameters
+    ----------
+    cov : numpy.ndarray
+        A symmetric covariance matrix, possibly indefinite.
+    eps : float
+        Lower bound for the eigenvalues of the correlation matrix.
+
+    Returns
+    -------
+    numpy.ndarray
+        The projected covariance matrix.
+    """
+    std = np.sqrt(np.clip(np.diag(cov), 0.0, None))
+    scale = np.where(std > 0, std, 1.0)
+    corr = cov / np.outer(scale, scale)
+    eigenvalues, eigenvectors = np.linalg.eigh((corr + corr.T) / 2)
+    if eigenvalues.min() >= eps:
+        return cov
+    corr = (eigenvectors * np.clip(eigenvalues, eps, None)) @ eigenvectors.T
+    diag = np.sqrt(np.clip(np.diag(corr), 1e-300, None))
+    corr = corr / np.outer(diag, diag)
+    return corr * np.outer(std, std)
+
+
+def center_returns(values):
+    """
+    Center every column of a return matrix on its own mean and zero-fill the missing days.
+
+    Parameters
+    ----------
+    values : numpy.ndarray
+        Daily returns with NaN where an asset has no return, one column per asset.
+
+    Returns
+    -------
+    tuple of numpy.ndarray
+        The centered zero-filled returns, the 0/1 mask of available days and the per-asset means.
+    """
+    mask = ~np.isnan(values)
+    weights = mask.astype(np.float64)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = np.where(mask, values, 0.0).sum(axis=0) / weights.sum(axis=0)
+    # Centering first keeps the one-pass sums below numerically stable
+    centered = np.where(mask, values - np.nan_to_num(mean), 0.0)
+    return centered, weights, mean
+
+
+def pairwise_block(centered_a, weights_a, centered_b, weights_b):
+    """
+    Compute the pairwise-complete covariance between two groups of centered return columns.
+
+    Parameters
+    ----------
+    centered_a, centered_b : numpy.ndarray
+        Centered zero-filled returns from center_returns, on the same days.
+    weights_a, weights_b : numpy.ndarray
+        The matching 0/1 masks of available days.
+
+    Returns
+    -------
+    tuple of numpy.ndarray
+        The covariance block (NaN where a pair has fewer than 2 common days) and the
+        number of common days per pair.
+    """
+    counts = weights_a.T @ weights_b
+    sums_a = centered_a.T @ weights_b  # sums_a[i, j]: sum of a_i over the days both a_i and b_j have a return
+    sums_b = weights_a.T @ centered_b  # sums_b[i, j]: sum of b_j over the same days
+    products = centered_a.T @ centered_b
+    with np.errstate(invalid='ignore', divide='ignore'):
+        cov = (products - sums_a * sums_b / counts) / (counts - 1)
+    return cov, counts
+
+
+def finalize_cov(cov, counts, project_psd=True, min_periods=2):
+    """
+    Treat pairs with too few common days as uncorrelated and optionally project the
+    covariance to the nearest positive semidefinite matrix.
+
+    Returns
+    -------
+    numpy.ndarray
+        A new covariance matrix.
+    """
+    cov = cov.copy()
+    insufficient = counts < min_periods
+    diagonal = np.eye(len(cov), dtype=bool)
+    cov[insufficient & ~diagonal] = 0.0
+    cov[insufficient & diagonal] = np.nan
+    if project_psd and len(cov) and not np.isnan(cov).any():
+        cov = nearest_psd(cov)
+    return cov
+
+
+def pairwise_complete_stats(returns, project_psd=True, min_periods=2):
+    """
+    Compute per-asset means and a pairwise-complete covariance of daily returns.
+
+    Every entry of the covariance uses all the days on which both assets have a return, and
+    every mean uses all the days on which that asset has a return. Pairs with fewer than
+    min_periods overlapping days are treated as uncorrelated.
+
+    Parameters
+    ----------
+    returns : pandas.DataFrame
+        Daily returns with NaN where an asset has no return, one column per asset.
+    project_psd : bool
+        Whether to project the covariance to the nearest positive semidefinite matrix.
+    min_periods : int
+        Minimum number of overlapping days for a covariance entry.
+
+    Returns
+    -------
+    ReturnStats
+        The aligned statistics.
+
+    Raises
+    ------
+    InsufficientHistoryError
+        If an asset has fewer than min_periods returns.
+    """
+    centered, weights, mean = center_returns(returns.to_numpy(dtype=np.float64))
+    cov, counts = pairwise_block(centered, weights, centered, weights)
+    check_history(returns.columns, counts, min_periods)
+    return ReturnStats(returns.columns, mean, finalize_cov(cov, counts, project_psd, min_periods), counts)
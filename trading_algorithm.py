@@ -1,19 +1,45 @@
-import yfinance as yf
 import pandas as pd
 import numpy as np
 import json
+import os
 import re
+import threading
+import time
+from collections import OrderedDict
 import matplotlib.pyplot as plt
 import seaborn as sns
 from datetime import datetime
+from prettytable import PrettyTable
 from scipy.optimize import minimize
 from session import Session
+from console import Console
+from fetch_scheduler import FetchError, default_scheduler
+from price_service import PriceServiceClient, PriceServiceError
+from price_stream import FileTickSource, LivePortfolioValuation
+from price_cache import LatestPriceCache
+from risk_report import MonteCarloRisk
+from export import ResultExporter
+from frontier import FrontierGrid, RISK_TOLERANCE_LEVELS
+from returns_alignment import InsufficientHistoryError, daily_returns, pairwise_complete_stats
+from incremental_stats import IncrementalReturnStats
+from horizons import HorizonComparison, horizon_starts
+import kernels
 
 class TradingAlgorithm:
-    def __init__(self, session: Session):
+    def __init__(self, session: Session, console: Console = None):
         self.session = session
+        self.console = console or Console()
+        try:
+            self.price_service = PriceServiceClient()
+        except PriceServiceError:
+            self.price_service = None  # No safe socket location; always fetch directly
         self.start_date = '2015-01-01'
         self.end_date = datetime.today().strftime('%Y-%m-%d')
+        self._frontier_grids = OrderedDict()  # (symbols, start_date, end_date, created_at) -> FrontierGrid
+        self._return_stats = OrderedDict()  # id(returns) -> (returns, ReturnStats)
+        self._return_stats_lock = threading.Lock()
+        self._user_stats = OrderedDict()  # username or (username, start_date) -> IncrementalReturnStats
+        self.stats_max_age = 900  # Seconds before a user's prices and statistics are fetched again
 
     def prompt_user(self):
         """Provide user with trading algorithm options."""
@@ -22,63 +48,83 @@ class TradingAlgorithm:
     def prompt_menu(self):
         """Display the trading algorithm menu and handle the user's choice."""
         while True:
-            print("\nInvestNow - Trading Algorithm")
-            print("1. View MVP")
-            print("2. View Correlation Matrix")
-            print("3. Automated Optimization")
-            print("4. Time Horizon")
-            print("5. Return to Main Menu")
-
-            choice = input("Enter your choice: ")
-
-            if choice == "1":
-                self.view_mvp()
-            elif choice == "2":
-                self.view_correlation_matrix()
-            elif choice == "3":
-                self.automated_optimization()
-            elif choice == "4":
-                self.handle_time_horizon()
-            elif choice == "5":
-                print("\nReturning to main menu.")
-                return
-            else:
-                print("\nInvalid choice. Please enter a number between 1 and 5.")
+            self.console.print("\nInvestNow - Trading Algorithm")
+            self.console.print("1. View MVP")
+            self.console.print("2. View Correlation Matrix")
+            self.console.print("3. Automated Optimization")
+            self.console.print("4. Time Horizon")
+            self.console.print("5. Live Valuation")
+            self.console.print("6. Risk Report")
+            self.console.print("7. Export Results")
+            self.console.print("8. Risk-Targeted Portfolio")
+            self.console.print("9. Compare Time Horizons")
+            self.console.print("10. Return to Main Menu")
+
+            choice = self.console.input("Enter your choice: ")
+
+            try:
+                if choice == "1":
+                    self.view_mvp()
+                elif choice == "2":
+                    self.view_correlation_matrix()
+                elif choice == "3":
+                    self.automated_optimization()
+                elif choice == "4":
+                    self.handle_time_horizon()
+                elif choice == "5":
+                    self.view_live_valuation()
+                elif choice == "6":
+                    self.view_risk_report()
+                elif choice == "7":
+                    self.export_results()
+                elif choice == "8":
+                    self.view_target_portfolio()
+                elif choice == "9":
+                    self.view_horizon_comparison()
+                elif choice == "10":
+                    self.console.print("\nReturning to main menu.")
+                    return
+                else:
+                    self.console.print("\nInvalid choice. Please enter a number between 1 and 10.")
+            except FetchError as error:
+                self.console.print(f"\nCould not fetch price data: {error}")
+            except InsufficientHistoryError as error:
+                self.console.print(f"\n{error}")
 
     def prompt_continue(self):
         """
         Ask the user whether to continue or quit.
         """
         while True:
-            continue_choice = input("\nWould you like to continue? (Y/N): ").lower()
+            continue_choice = self.console.input("\nWould you like to continue? (Y/N): ").lower()
             if continue_choice == 'y':
                 return True
             elif continue_choice == 'n':
                 return False
             else:
-                print("\nInvalid choice. Please enter Y or N.")
+                self.console.print("\nInvalid choice. Please enter Y or N.")
 
     def handle_time_horizon(self):
         while True:
-            print("\nTime Horizon")
-            print("1. View Time Horizon")
-            print("2. Change Time Horizon")
-            print("3. Return to Trading Algorithm Menu")
+            self.console.print("\nTime Horizon")
+            self.console.print("1. View Time Horizon")
+            self.console.print("2. Change Time Horizon")
+            self.console.print("3. Return to Trading Algorithm Menu")
             
-            choice = input("Enter your choice: ")
+            choice = self.console.input("Enter your choice: ")
             
             if choice == "1":
-                print(f"\nCurrent Time Horizon: {self.start_date} to {self.end_date}")
+                self.console.print(f"\nCurrent Time Horizon: {self.start_date} to {self.end_date}")
                 if not self.prompt_continue():
                     return
             elif choice == "2":
                 while True:
-                    new_start_date = input("\nEnter the new start date (YYYY-MM-DD): ")
-                    new_end_date = input("Enter the new end date (YYYY-MM-DD): ")
+                    new_start_date = self.console.input("\nEnter the new start date (YYYY-MM-DD): ")
+                    new_end_date = self.console.input("Enter the new end date (YYYY-MM-DD): ")
 
                     # Validate the date format
                     if not re.match(r'\d{4}-\d{2}-\d{2}', new_start_date) or not re.match(r'\d{4}-\d{2}-\d{2}', new_end_date):
-                        print("Invalid date format. Please use YYYY-MM-DD.")
+                        self.console.print("Invalid date format. Please use YYYY-MM-DD.")
                         continue
                     
                     # Convert to datetime objects
@@ -86,12 +132,12 @@ class TradingAlgorithm:
                         new_start_date = datetime.strptime(new_start_date, '%Y-%m-%d')
                         new_end_date = datetime.strptime(new_end_date, '%Y-%m-%d')
                     except ValueError:
-                        print("Invalid date. Please enter a valid date in the format YYYY-MM-DD.")
+                        self.console.print("Invalid date. Please enter a valid date in the format YYYY-MM-DD.")
                         continue
                     
                     # Check if end_date is after start_date
                     if new_end_date < new_start_date:
-                        print("End date must be after start date.")
+                        self.console.print("End date must be after start date.")
                         continue
                     
                     # Update class attributes
@@ -106,7 +152,47 @@ class TradingAlgorithm:
             elif choice == "3":
                 return
             else:
-                print("\nInvalid choice. Please enter a number between 1 and 3.")
+                self.console.print("\nInvalid choice. Please enter a number between 1 and 3.")
+
+    def view_live_valuation(self):
+        """Stream price ticks from a local file and print the updated portfolio value on every tick."""
+        while True:
+            path = self.console.input("\nEnter the path of the price tick file: ").strip()
+            if path:
+                break
+            self.console.print("\nPath cannot be empty. Please enter a valid path.")
+
+        username = self.session.get_current_user()
+        with open('users.json', 'r') as f:
+            stocks = json.load(f).get(username, {}).get('stocks', [])
+        # Start from the latest market prices so the total never mixes in cost basis
+        price_cache = LatestPriceCache()
+        last_prices = price_cache.get_latest([stock['symbol'] for stock in stocks])
+        valuation = LivePortfolioValuation()
+        valuation.subscribe(username, stocks, last_prices)
+        source = FileTickSource(path)
+
+        unpriced = valuation.get_unpriced(username)
+        if unpriced:
+            self.console.print(f"\nNo price yet for {', '.join(unpriced)}; "
+                               "they are left out of the portfolio value until their first tick.")
+
+        def print_update(user, symbol):
+            weight = valuation.get_weight(user, symbol)
+            unpriced = valuation.get_unpriced(user)
+            note = f" (excluding unpriced {', '.join(unpriced)})" if unpriced else ""
+            self.console.print(f"{symbol}: value {valuation.get_value(user, symbol):.2f}, weight {weight:.4f} | "
+                  f"Portfolio value: {valuation.get_total(user):.2f}{note}")
+
+        self.console.print("\nStreaming prices. Press Ctrl+C to stop.")
+        try:
+            # The streamed prices are written back to the cache, so View Stocks shows them
+            valuation.run(source, on_update=print_update, price_cache=price_cache)
+        except FileNotFoundError:
+            self.console.print(f"\nTick file {path} not found.")
+        except KeyboardInterrupt:
+            source.stop()
+            self.console.print("\nStopped streaming prices.")
 
     def get_user_stocks(self, username):
         with open('users.json', 'r') as f:
@@ -114,15 +200,25 @@ class TradingAlgorithm:
         
         user = users.get(username)
         if not user:
-            print(f"User {username} not found.")
+            self.console.print(f"User {username} not found.")
             return None
         
-        stocks = user['stocks']
+        return self.value_stocks(username, user['stocks'])
+
+    def value_stocks(self, username, stocks):
+        """
+        Add the current price, value and portfolio weight to each of the user's stock records.
+        The prices come from the user's return statistics, so callers that already loaded the
+        user data can value the holdings without reading the user file again.
+        """
+        if not stocks:
+            return stocks
+
+        symbols = [stock['symbol'] for stock in stocks]
+        last_prices = self.get_user_statistics(username, symbols).last_prices
         total_portfolio_value = 0
         for stock in stocks:
-            symbol = stock['symbol']
-            data = yf.download(symbol, start=self.start_date, end=self.end_date)
-            stock['current_price'] = data['Adj Close'][-1]
+            stock['current_price'] = last_prices[stock['symbol']]
             stock['value'] = stock['shares'] * stock['current_price']
             total_portfolio_value += stock['value']
 
@@ -131,18 +227,86 @@ class TradingAlgorithm:
 
         return stocks
 
-    def get_stock_data(self, symbols):
-        data = yf.download(symbols, start=self.start_date, end=self.end_date)
-        return data['Adj Close']
+    def get_stock_data(self, symbols, start_date=None, end_date=None):
+        # Defaults to the current time horizon
+        start_date = start_date or self.start_date
+        end_date = end_date or self.end_date
+        # Use the shared local price service when one is running, and fetch directly otherwise
+        if self.price_service is not None and os.path.exists(self.price_service.socket_path):
+            try:
+                return self.price_service.get_prices(symbols, start_date, end_date)
+            except (OSError, PriceServiceError):
+                pass
+        return default_scheduler().fetch(symbols, start_date, end_date)
+
+    def get_user_statistics(self, username, symbols, start_date=None):
+        """
+        Return the user's return statistics, patched to cover exactly the given symbols.
+
+        Only the prices of symbols added since the last call are fetched, and only their rows and
+        columns of the covariance are computed. The statistics are rebuilt from fresh prices when the
+        time horizon changes or after stats_max_age seconds, so new closing prices are picked up.
+        A start_date other than the current one is kept as separate statistics for the user.
+        """
+        start_date = start_date or self.start_date
+        key = username if start_date == self.start_date else (username, start_date)
+        state = self._user_stats.get(key)
+        if (state is None or (state.start_date, state.end_date) != (start_date, self.end_date)
+                or time.time() - state.created_at > self.stats_max_age):
+            state = IncrementalReturnStats(start_date, self.end_date)
+        self._user_stats[key] = state
+        self._user_stats.move_to_end(key)
+        while len(self._user_stats) > 32:
+            self._user_stats.popitem(last=False)
+
+        state.sync(symbols, lambda added: self.get_stock_data(added, start_date=start_date))
+        return state
+
+    def get_user_returns(self, username, symbols):
+        """
+        Return the daily returns of the user's symbols from the incrementally maintained statistics.
+        The matching statistics are registered so the optimizers reuse them for this frame.
+        """
+        state = self.get_user_statistics(username, symbols)
+        returns = state.returns(symbols)
+        self.set_return_stats(returns, state.stats(symbols))
+        return returns
 
     def calculate_returns(self, data):
-        return data.pct_change()
+        # Returns over each symbol's own trading days; late listings stay NaN and the
+        # statistics are computed pairwise-complete
+        return daily_returns(data)
+
+    def get_return_stats(self, returns):
+        """
+        Return the pairwise-complete means and covariance of the returns.
+        The statistics of the last few returns frames are kept, so optimizers evaluating the
+        objective many times on the same frame compute them only once.
+        """
+        with self._return_stats_lock:
+            cached = self._return_stats.get(id(returns))
+            if cached is not None and cached[0] is returns:
+                self._return_stats.move_to_end(id(returns))
+                return cached[1]
+
+        stats = pairwise_complete_stats(returns)
+        self.set_return_stats(returns, stats)
+        return stats
+
+    def set_return_stats(self, returns, stats):
+        """Register precomputed statistics of a returns frame for get_return_stats."""
+        with self._return_stats_lock:
+            self._return_stats[id(returns)] = (returns, stats)
+            self._return_stats.move_to_end(id(returns))
+            while len(self._return_stats) > 8:
+                self._return_stats.popitem(last=False)
 
     def calculate_portfolio_return(self, weights, returns):
-        return np.sum(returns.mean() * weights) * 252
+        return np.sum(self.get_return_stats(returns).mean * weights) * 252
 
     def calculate_portfolio_risk(self, weights, returns):
-        return np.sqrt(np.dot(weights.T, np.dot(returns.cov() * 252, weights)))
+        cov = self.get_return_stats(returns).cov * 252
+        return np.sqrt(np.dot(weights.T, np.dot(cov, weights)))
 
     def calculate_sharpe_ratio(self, weights, returns):
         portfolio_return = self.calculate_portfolio_return(weights, returns)
@@ -170,51 +334,165 @@ class TradingAlgorithm:
                           method='SLSQP', bounds=bounds, constraints=constraints)
         return result
 
+    def compute_frontier(self, returns, num_portfolios=50000, seed=42):
+        """
+        Simulate random long-only portfolios and return their risk, return and Sharpe ratio.
+
+        Returns
+        -------
+        pandas.DataFrame
+            One row per portfolio with 'Risk', 'Return' and 'Sharpe Ratio' columns.
+        """
+        # Set a seed for the random number generator
+        np.random.seed(seed)
+
+        # Draw all portfolios at once; the draws are the same as one portfolio at a time
+        num_assets = len(returns.columns)
+        weights = np.random.random((num_portfolios, num_assets))
+
+        stats = self.get_return_stats(returns)
+        results = kernels.evaluate_portfolios(weights, stats.mean * 252, stats.cov * 252)
+
+        # Convert results to Pandas DataFrame
+        return pd.DataFrame(np.column_stack(results), columns=['Risk', 'Return', 'Sharpe Ratio'])
+
+    def compute_rebalance_trades(self, user_stocks, target_weights):
+        """
+        Compute the trades that move the user's holdings to the target weights.
+
+        Returns
+        -------
+        list of dict
+            One trade per holding with 'symbol', 'action', 'shares', 'current_weight' and 'target_weight'.
+        """
+        total_value = sum(stock['value'] for stock in user_stocks)
+        trades = []
+        for stock, target_weight in zip(user_stocks, target_weights):
+            diff_value = target_weight * total_value - stock['value']
+            trades.append({
+                'symbol': stock['symbol'],
+                'action': 'Buy' if diff_value > 0 else 'Sell',
+                'shares': abs(diff_value) / stock['current_price'],
+                'current_weight': stock['weight'],
+                'target_weight': float(target_weight)
+            })
+        return trades
+
+    def get_frontier_grid(self, username, symbols):
+        """
+        Return the efficient frontier grid of the user's symbols over the current time horizon.
+        The grid is built once per set of holdings and return statistics and reused afterwards,
+        so it is rebuilt together with the statistics; the grids of the last 8 combinations are kept.
+        """
+        state = self.get_user_statistics(username, symbols)
+        key = (tuple(symbols), state.start_date, state.end_date, state.created_at)
+        if key not in self._frontier_grids:
+            self._frontier_grids[key] = FrontierGrid(state.returns(symbols), stats=state.stats(symbols))
+            while len(self._frontier_grids) > 8:
+                self._frontier_grids.popitem(last=False)
+        self._frontier_grids.move_to_end(key)
+        return self._frontier_grids[key]
+
+    def get_user_symbols(self, username):
+        """Return the symbols of the user's holdings without fetching their prices."""
+        with open('users.json', 'r') as f:
+            users = json.load(f)
+        return [stock['symbol'] for stock in users.get(username, {}).get('stocks', [])]
+
+    def get_risk_tolerance(self, username):
+        """Return the risk tolerance stored in the user's profile, or 'not set'."""
+        with open('users.json', 'r') as f:
+            users = json.load(f)
+        return users.get(username, {}).get('risk_tolerance', 'not set')
+
+    def view_target_portfolio(self):
+        """
+        Show the efficient portfolio matching the user's risk tolerance or a target volatility,
+        and the trades needed to reach it.
+        """
+        self.console.print("\nRisk-Targeted Portfolio")
+        self.console.print("1. Use Profile Risk Tolerance")
+        self.console.print("2. Enter Target Volatility")
+        self.console.print("3. Return to Trading Algorithm Menu")
+
+        choice = self.console.input("Enter your choice: ")
+        username = self.session.get_current_user()
+
+        if choice == "1":
+            risk_tolerance = self.get_risk_tolerance(username).lower()
+            if risk_tolerance not in RISK_TOLERANCE_LEVELS:
+                self.console.print("\nRisk tolerance is not set in your profile. Using 'medium'.")
+                risk_tolerance = 'medium'
+            target_volatility = None
+        elif choice == "2":
+            while True:
+                target_volatility = self.console.input("\nEnter the target annualized volatility (e.g. 0.15): ").strip()
+                try:
+                    target_volatility = float(target_volatility)
+                    if target_volatility > 0:
+                        break
+                    self.console.print("\nTarget volatility should be a positive number.")
+                except ValueError:
+                    self.console.print("\nInvalid input. Please enter a number for the target volatility.")
+        elif choice == "3":
+            return
+        else:
+            self.console.print("\nInvalid choice. Please enter a number between 1 and 3.")
+            return
+
+        user_stocks = self.get_user_stocks(username)
+        if not user_stocks:
+            self.console.print("\nYou currently have no stocks in your portfolio.")
+            return
+        symbols = [stock['symbol'] for stock in user_stocks]
+        grid = self.get_frontier_grid(username, symbols)
+        if grid.failed_points:
+            self.console.print(f"\nNote: {grid.failed_points} frontier points could not be solved and were skipped.")
+
+        if target_volatility is None:
+            weights, expected_return, volatility = grid.portfolio_for_risk_tolerance(risk_tolerance)
+            self.console.print(f"\nEfficient Portfolio for '{risk_tolerance}' Risk Tolerance:")
+        else:
+            weights, expected_return, volatility = grid.portfolio_for_volatility(target_volatility)
+            self.console.print(f"\nEfficient Portfolio for {target_volatility:.2%} Target Volatility:")
+
+        for symbol, weight in zip(symbols, weights):
+            self.console.print(f"{symbol}: {weight:.4f}")
+        self.console.print(f"Expected Return: {expected_return:.2%}")
+        self.console.print(f"Volatility: {volatility:.2%}")
+
+        self.console.print("\nTo adjust your portfolio, perform the following actions:")
+        for trade in self.compute_rebalance_trades(user_stocks, weights):
+            self.console.print(f"{trade['action']} approximately {trade['shares']:.2f} shares of {trade['symbol']}.")
+
     def view_mvp(self):
         username = self.session.get_current_user()
         user_stocks = self.get_user_stocks(username)
         symbols = [stock['symbol'] for stock in user_stocks]
         weights = [stock['weight'] for stock in user_stocks]
 
-        data = self.get_stock_data(symbols)
-        returns = self.calculate_returns(data)
+        returns = self.get_user_returns(username, symbols)
 
         # Print current portfolio weights
-        print("\nCurrent Portfolio Weights:")
+        self.console.print("\nCurrent Portfolio Weights:")
         for symbol, weight in zip(symbols, weights):
-            print(f"{symbol}: {weight:.4f}")
+            self.console.print(f"{symbol}: {weight:.4f}")
 
         # Find and print minimum variance portfolio
         mvp_result = self.minimum_variance_portfolio(returns)
-        print("\nMinimum Variance Portfolio Weights:")
+        self.console.print("\nMinimum Variance Portfolio Weights:")
         for symbol, weight in zip(symbols, mvp_result.x):
-            print(f"{symbol}: {weight:.4f}")
+            self.console.print(f"{symbol}: {weight:.4f}")
 
         # Find and print maximum Sharpe ratio portfolio
         msr_result = self.maximum_sharpe_ratio_portfolio(returns)
-        print("\nMaximum Sharpe Ratio Portfolio Weights:")
+        self.console.print("\nMaximum Sharpe Ratio Portfolio Weights:")
         for symbol, weight in zip(symbols, msr_result.x):
-            print(f"{symbol}: {weight:.4f}")
-
-        # Set a seed for the random number generator
-        np.random.seed(42)
+            self.console.print(f"{symbol}: {weight:.4f}")
 
         # Generate random portfolios
-        num_portfolios = 50000
-        num_assets = len(symbols)
-        results = np.zeros((3, num_portfolios))
-        for i in range(num_portfolios):
-            weights = np.random.random(num_assets)
-            weights /= np.sum(weights)
-            portfolio_return = self.calculate_portfolio_return(weights, returns)
-            portfolio_risk = self.calculate_portfolio_risk(weights, returns)
-            sharpe_ratio = portfolio_return / portfolio_risk
-            results[0, i] = portfolio_risk
-            results[1, i] = portfolio_return
-            results[2, i] = sharpe_ratio
-
-        # Convert results array to Pandas DataFrame
-        results_frame = pd.DataFrame(results.T, columns=['Risk', 'Return', 'Sharpe Ratio'])
+        results_frame = self.compute_frontier(returns)
+        weights = np.array(weights)
 
         # Plot efficient frontier with color map according to Sharpe Ratio
         plt.scatter(results_frame.Risk, results_frame.Return, c=results_frame['Sharpe Ratio'], cmap='YlGnBu', marker='o', s=10, alpha=0.3)
@@ -233,11 +511,10 @@ class TradingAlgorithm:
         user_stocks = self.get_user_stocks(username)
         symbols = [stock['symbol'] for stock in user_stocks]
 
-        data = self.get_stock_data(symbols)
-        returns = self.calculate_returns(data)
+        returns = self.get_user_returns(username, symbols)
 
         # Calculate correlation matrix
-        corr_matrix = returns.corr()
+        corr_matrix = self.get_return_stats(returns).correlation()
 
         # Create a custom diverging palette
         cmap = sns.diverging_palette(130, 10, s=80, l=55, n=100, as_cmap=True)
@@ -248,34 +525,116 @@ class TradingAlgorithm:
         plt.title('Correlation Matrix')
         plt.show()
 
+    def view_risk_report(self):
+        """Print Monte Carlo VaR and CVaR for the current portfolio and the MVP and MSR portfolios."""
+        username = self.session.get_current_user()
+        user_stocks = self.get_user_stocks(username)
+        if not user_stocks:
+            self.console.print("\nYou currently have no stocks in your portfolio.")
+            return
+        symbols = [stock['symbol'] for stock in user_stocks]
+        weights = [stock['weight'] for stock in user_stocks]
+        total_value = sum(stock['value'] for stock in user_stocks)
+
+        returns = self.get_user_returns(username, symbols)
+
+        portfolios = {
+            'Current': weights,
+            'MVP': self.minimum_variance_portfolio(returns).x,
+            'MSR': self.maximum_sharpe_ratio_portfolio(returns).x
+        }
+        report = MonteCarloRisk(returns).report(portfolios)
+
+        table = PrettyTable(['Portfolio', 'Horizon (days)', 'Confidence', 'VaR', 'CVaR', 'VaR ($)', 'CVaR ($)'])
+        for row in report.itertuples(index=False):
+            table.add_row([row.Portfolio, row.Horizon, f"{row.Confidence:.0%}", f"{row.VaR:.2%}", f"{row.CVaR:.2%}",
+                           f"{row.VaR * total_value:.2f}", f"{row.CVaR * total_value:.2f}"])
+        self.console.print("\nMonte Carlo Risk Report")
+        self.console.print(table)
+
+    def compare_horizons(self, username, symbols):
+        """
+        Solve the MVP and MSR portfolios over the 1-year, 3-year, 5-year and since-2015 horizons
+        ending on the current end date.
+
+        The returns of the longest horizon are loaded once, reusing the user's statistics when the
+        current time horizon already covers it and keeping them with the user's statistics otherwise,
+        and the horizons are solved concurrently.
+
+        Returns
+        -------
+        pandas.DataFrame
+            One row per horizon and portfolio, as returned by HorizonComparison.solve.
+        """
+        first_start = min(horizon_starts(self.end_date).values()).strftime('%Y-%m-%d')
+        start_date = min(self.start_date, first_start)
+        returns = self.get_user_statistics(username, symbols, start_date).returns(symbols)
+
+        comparison = HorizonComparison(returns, self.end_date)
+        for label, horizon_returns in comparison.returns.items():
+            self.set_return_stats(horizon_returns, comparison.stats[label])
+        return comparison.solve({
+            'MVP': lambda horizon_returns: self.minimum_variance_portfolio(horizon_returns).x,
+            'MSR': lambda horizon_returns: self.maximum_sharpe_ratio_portfolio(horizon_returns).x
+        })
+
+    def view_horizon_comparison(self):
+        """Show the MVP and MSR weights, return and risk over several time horizons side by side."""
+        username = self.session.get_current_user()
+        symbols = self.get_user_symbols(username)
+        if not symbols:
+            self.console.print("\nYou currently have no stocks in your portfolio.")
+            return
+
+        results = self.compare_horizons(username, symbols)
+        for name, portfolio in results.groupby('Portfolio', sort=False):
+            table = PrettyTable([''] + [f"{row.Horizon} (from {row.Start})" for row in portfolio.itertuples()])
+            for symbol in symbols:
+                table.add_row([symbol] + [f"{weight:.4f}" for weight in portfolio[symbol]])
+            table.add_row(['Expected Return'] + [f"{value:.2%}" for value in portfolio['Return']])
+            table.add_row(['Volatility'] + [f"{value:.2%}" for value in portfolio['Risk']])
+            table.add_row(['Sharpe Ratio'] + [f"{value:.2f}" for value in portfolio['Sharpe Ratio']])
+            self.console.print(f"\n{name} Across Time Horizons")
+            self.console.print(table)
+
+    def export_results(self):
+        """Export the user's weights, frontier, correlation matrix and rebalance trades as columnar files."""
+        username = self.session.get_current_user()
+        exporter = ResultExporter()
+        paths = exporter.export_user(self, username)
+        if paths:
+            self.console.print(f"\nExported {len(paths)} files to {exporter.out_dir}:")
+            for path in paths:
+                self.console.print(path)
+        else:
+            self.console.print("\nYou currently have no stocks in your portfolio.")
+
     def automated_optimization(self):
         """Provide user with actions needed to adjust portfolio to minimum variance or maximum Sharpe ratio portfolio."""
         while True:
-            print("\nAutomated Optimization - Adjust Portfolio")
-            print("1. Minimum Variance Portfolio (MVP)")
-            print("2. Maximum Sharpe Ratio Portfolio (MSR)")
-            print("3. Return to Trading Algorithm Menu")
+            self.console.print("\nAutomated Optimization - Adjust Portfolio")
+            self.console.print("1. Minimum Variance Portfolio (MVP)")
+            self.console.print("2. Maximum Sharpe Ratio Portfolio (MSR)")
+            self.console.print("3. Return to Trading Algorithm Menu")
 
-            choice = input("Enter your choice: ")
+            choice = self.console.input("Enter your choice: ")
 
             if choice == "1":
                 target = 'MVP'
             elif choice == "2":
                 target = 'MSR'
             elif choice == "3":
-                print("\nReturning to Trading Algorithm menu.")
+                self.console.print("\nReturning to Trading Algorithm menu.")
                 return
             else:
-                print("\nInvalid choice. Please enter a number between 1 and 3.")
+                self.console.print("\nInvalid choice. Please enter a number between 1 and 3.")
                 return
 
             username = self.session.get_current_user()
             user_stocks = self.get_user_stocks(username)
             symbols = [stock['symbol'] for stock in user_stocks]
-            weights = [stock['weight'] for stock in user_stocks]
 
-            data = self.get_stock_data(symbols)
-            returns = self.calculate_returns(data)
+            returns = self.get_user_returns(username, symbols)
 
             if target == 'MVP':
                 result = self.minimum_variance_portfolio(returns)
@@ -284,21 +643,11 @@ class TradingAlgorithm:
 
             target_weights = result.x
 
-            print(f"\nTo adjust your portfolio to the {target}, perform the following actions:")
-
-            for symbol, current_weight, target_weight, stock in zip(symbols, weights, target_weights, user_stocks):
-                current_value = stock['value']
-                target_value = target_weight * sum([stock['value'] for stock in user_stocks])
-                diff_value = target_value - current_value
-
-                if diff_value > 0:
-                    action = 'Buy'
-                else:
-                    action = 'Sell'
+            self.console.print(f"\nTo adjust your portfolio to the {target}, perform the following actions:")
 
-                num_shares = abs(diff_value) / stock['current_price']
-                print(f"{action} approximately {num_shares:.2f} shares of {symbol}.")
+            for trade in self.compute_rebalance_trades(user_stocks, target_weights):
+                self.console.print(f"{trade['action']} approximately {trade['shares']:.2f} shares of {trade['symbol']}.")
 
             if not self.prompt_continue():
-                print("\nReturning to Trading Algorithm menu.")
+                self.console.print("\nReturning to Trading Algorithm menu.")
                 return